@@ -0,0 +1,199 @@
+import time
+
+
+# ------------------------------------------------------------------------------------------------------------AI POLICIES
+# Each special type maps to a policy object that drives an AI fighter. Fighter.move fills one
+# Perception per tick and hands it to the policy in two steps: guard() runs first, before the
+# general fight/move decision, and act() makes that decision. Both return the horizontal move dx.
+# A new character only needs an entry in POLICIES; the per-tick cost doesn't grow with their number.
+class Perception:
+    __slots__ = ("now", "direct_distance", "toward", "distance", "direction", "attack_range", "special_ready",
+                 "curse_mine")
+
+    def update(self, fighter, target, screen_width, now):
+        offset = target.rect.centerx - fighter.rect.centerx
+        self.now = now
+        self.direct_distance = abs(offset)
+        self.toward = 1 if offset > 0 else -1
+        # Shortest way to the target, which may be across the screen wrap-around
+        wrapped = screen_width - self.direct_distance
+        if wrapped < self.direct_distance:
+            self.distance = wrapped
+            self.direction = -self.toward
+        else:
+            self.distance = self.direct_distance
+            self.direction = self.toward
+        self.attack_range = fighter.attack_range * fighter.rect.width
+        self.special_ready = now - fighter.special_last_used >= fighter.special_cooldown
+        self.curse_mine = fighter.cursing > 0
+
+
+class AIPolicy:
+    def guard(self, fighter, target, view, dx):
+        return dx
+
+    def act(self, fighter, target, view, dx):
+        return dx
+
+
+def basic_attack(fighter, target, attack1_chance):
+    fighter.initiate_attack(1 if fighter.fight.rng.random() < attack1_chance else 2, target)
+
+
+class RangePolicy(AIPolicy):
+    # Keep to an optimal range, fire the special from a distance (or inside a band around the
+    # optimal range), basic-attack when close. Ranges are multiples of the attack range in pixels.
+    def __init__(self, ranged, attack1_chance, special_beyond=None, special_band=None,
+                 approach=(1, 1), retreat=(0.8, 1)):
+        self.optimal = 1.2 if ranged else 0.9
+        self.attack1_chance = attack1_chance
+        self.special_beyond = special_beyond
+        self.special_band = special_band
+        self.approach_beyond, self.approach_speed = approach
+        self.retreat_within, self.retreat_speed = retreat
+
+    def act(self, fighter, target, view, dx):
+        attack_range = view.attack_range
+        optimal_range = attack_range * self.optimal
+        distance = view.distance
+        if self.special_band:
+            # The band special doesn't stop the basic-attack/move decision in the same tick
+            low, high = self.special_band
+            if view.special_ready and optimal_range * low < distance < optimal_range * high:
+                fighter.initiate_attack(8, target)
+        elif view.special_ready and distance > attack_range * self.special_beyond:
+            fighter.initiate_attack(8, target)
+            return dx
+        if distance < attack_range * 1.1 and fighter.attack_cooldown == 0:
+            basic_attack(fighter, target, self.attack1_chance)
+        elif not fighter.blocking:
+            if distance > optimal_range * self.approach_beyond:
+                dx = fighter.speed * view.direction * self.approach_speed
+                fighter.running = True
+            elif distance < optimal_range * self.retreat_within:
+                dx = -fighter.speed * view.direction * self.retreat_speed
+                fighter.running = True
+        return dx
+
+
+class GuardianPolicy(AIPolicy):
+    # Turtles while the pull recharges, pulls as soon as it can, then punishes the rooted target
+    def guard(self, fighter, target, view, dx):
+        fighter.defensive_mode = not view.special_ready
+        if fighter.defensive_mode and view.direct_distance < view.attack_range * 1.5:
+            fighter.blocking = True
+        return dx
+
+    def act(self, fighter, target, view, dx):
+        attack_range = view.attack_range
+        distance = view.distance
+        if target.rooted:
+            if distance < attack_range * 1.1:
+                if fighter.attack_cooldown == 0:
+                    basic_attack(fighter, target, 0.8)
+            elif not fighter.blocking:
+                dx = fighter.speed * view.direction
+                fighter.running = True
+        elif view.special_ready:
+            fighter.initiate_attack(8, target)
+        elif not fighter.blocking:
+            if distance < attack_range * 2:
+                dx = -fighter.speed * view.direction
+                fighter.running = True
+            elif distance > attack_range * 3:
+                dx = fighter.speed * view.direction * 0.5
+                fighter.running = True
+        return dx
+
+
+class SagePolicy(AIPolicy):
+    # Keeps away and blocks until the curse is up, then presses in and attacks often while it lasts
+    def guard(self, fighter, target, view, dx):
+        attack_range = view.attack_range
+        distance = view.direct_distance
+        if view.curse_mine:
+            optimal_range = attack_range * 0.8
+            if distance > optimal_range * 1.1:
+                dx = fighter.speed * view.toward * 1.2
+                fighter.running = True
+            elif distance < optimal_range * 0.7:
+                dx = -fighter.speed * view.toward * 0.5
+                fighter.running = True
+            if distance < attack_range * 1.2 and fighter.attack_cooldown == 0:
+                if fighter.fight.rng.random() < 0.8:
+                    basic_attack(fighter, target, 0.6)
+        else:
+            fighter.defensive_mode = True
+            if distance < attack_range * 1.5:
+                if target.attacking:
+                    fighter.blocking = True
+                elif not fighter.blocking:
+                    dx = -fighter.speed * view.toward
+                    fighter.running = True
+        return dx
+
+    def act(self, fighter, target, view, dx):
+        attack_range = view.attack_range
+        distance = view.distance
+        if view.curse_mine:
+            optimal_range = attack_range * 1.2
+            if distance < attack_range * 1.2 and fighter.attack_cooldown == 0:
+                if fighter.fight.rng.random() < 0.8:
+                    basic_attack(fighter, target, 0.7)
+            elif not fighter.blocking:
+                if distance > optimal_range * 1.1:
+                    dx = fighter.speed * view.direction * 1.2
+                    fighter.running = True
+                elif distance < optimal_range * 0.7:
+                    dx = -fighter.speed * view.direction * 0.8
+                    fighter.running = True
+        elif view.special_ready:
+            if distance > attack_range * 2.5:
+                fighter.initiate_attack(8, target)
+            elif target.attacking:
+                fighter.blocking = True
+            elif not fighter.blocking:
+                dx = -fighter.speed * view.direction
+                fighter.running = True
+        elif distance < attack_range * 1.1 and fighter.attack_cooldown == 0:
+            basic_attack(fighter, target, 0.6)
+        return dx
+
+
+class InputPolicy(AIPolicy):
+    # Replays a policy that played by input bitmasks (the lookahead AI) from the recorded fight.inputs
+    def act(self, fighter, target, view, dx):
+        return fighter.apply_controls(fighter.fight.inputs[fighter.player - 1], target, dx)
+
+
+class TimedPolicy(AIPolicy):
+    # Wraps another policy and adds up the time it spends deciding (simulate.py --ai-cost)
+    def __init__(self, policy):
+        self.policy = policy
+        self.calls = 0
+        self.seconds = 0.0
+
+    def guard(self, fighter, target, view, dx):
+        start = time.perf_counter()
+        dx = self.policy.guard(fighter, target, view, dx)
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        return dx
+
+    def act(self, fighter, target, view, dx):
+        start = time.perf_counter()
+        dx = self.policy.act(fighter, target, view, dx)
+        self.seconds += time.perf_counter() - start
+        return dx
+
+
+POLICIES = {
+    "global_stun": RangePolicy(False, 0.7, special_beyond=1.5),  # Knight
+    "global_attack": RangePolicy(True, 0.6, special_beyond=1.5, approach=(1.2, 0.8)),  # Mage
+    "screen_dash": RangePolicy(False, 0.7, special_beyond=2),  # Ranger
+    "health_steal": RangePolicy(True, 0.6, special_band=(0.9, 1.1), approach=(1.1, 0.7),
+                                retreat=(0.9, 0.7)),  # Warlock
+    "pull_root": GuardianPolicy(),
+    "curse_effect": SagePolicy(),
+    None: AIPolicy(),
+}
@@ -0,0 +1,261 @@
+import argparse
+import os
+import random
+import time
+from bisect import bisect_left
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from engine import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, CHARACTER_DATA, FightState, ManualClock, build_fighter
+
+# ---------------------------------------------------------------------------------------------------------------ARENA
+# Free-for-all or team fights between any number of fighters on the wrap-around stage. At the
+# start of each tick every fighter takes the nearest living enemy as its target (the one its AI or
+# controls play against), and attacks hit every enemy inside the attack area rather than only that
+# target. Both questions go through a broadphase instead of testing every pair of fighters.
+# Ties and hits go in player order, so the result doesn't depend on the broadphase.
+MARGIN = 100  # How far a fighter may move during the move phase (a Ranger dash is 75 px a tick)
+
+
+class WrapBroadphase:
+    # Sorted intervals on a circle: fighters are kept sorted by centre x modulo the stage width. An
+    # area query is one or two bisects, the nearest enemy is found by walking outwards from the
+    # fighter. The order barely changes between ticks, so re-sorting the previous order is close to
+    # linear, and so is the whole tick.
+    def __init__(self, width=SCREEN_WIDTH):
+        self.width = width
+        self.order = []
+        self.keys = []
+        self.index = {}  # fighter -> position in order
+        self.half = 0  # Widest fighter half width
+        self.reach = 0  # ... plus how far fighters may have moved since the rebuild
+
+    def rebuild(self, fighters):
+        width = self.width
+        if len(self.order) != len(fighters):
+            self.order = list(fighters)
+            self.half = max(fighter.rect.width for fighter in fighters) // 2
+        self.reach = self.half
+        self.order.sort(key=lambda fighter: fighter.rect.centerx % width)
+        self.keys = [fighter.rect.centerx % width for fighter in self.order]
+        self.index = {fighter: i for i, fighter in enumerate(self.order)}
+
+    def allow_movement(self, margin):
+        self.reach = self.half + margin
+
+    def spans(self, low, high):
+        # [low, high) wrapped onto [0, width): one or two key ranges
+        width = self.width
+        if high - low >= width:
+            return ((0, width),)
+        start = low % width
+        end = start + high - low
+        if end <= width:
+            return ((start, end),)
+        return (start, width), (0, end - width)
+
+    def query(self, area):
+        # Fighters overlapping area, including across the wrap-around
+        width = self.width
+        areas = [area, area.move(width, 0), area.move(-width, 0)]
+        keys, order = self.keys, self.order
+        found = []
+        for start, end in self.spans(area.left - self.reach, area.right + self.reach):
+            for i in range(bisect_left(keys, start), bisect_left(keys, end)):
+                fighter = order[i]
+                if fighter.rect.collidelist(areas) >= 0:
+                    found.append(fighter)
+        found.sort(key=player_order)
+        return found
+
+    def nearest(self, fighter, teams):
+        # Closest living fighter of another team, by wrap-around distance, or None. Only valid
+        # before anyone moves: the walk stops on the sorted keys.
+        width = self.width
+        order, keys = self.order, self.keys
+        count = len(order)
+        i = self.index[fighter]
+        x = fighter.rect.centerx
+        team = teams[fighter]
+        best = None
+        best_distance = width
+        for direction in (1, -1):
+            j = i
+            for _ in range(count - 1):
+                j = (j + direction) % count
+                if (keys[j] - keys[i]) * direction % width > best_distance:
+                    break
+                other = order[j]
+                if other.alive and teams[other] != team:
+                    distance = abs(other.rect.centerx - x) % width
+                    distance = min(distance, width - distance)
+                    if distance < best_distance or (distance == best_distance and other.player < best.player):
+                        best, best_distance = other, distance
+        return best
+
+
+class BruteForcePhase:
+    # Every pair tested: the reference the broadphase must agree with, and what it is measured against
+    def __init__(self, width=SCREEN_WIDTH):
+        self.width = width
+        self.fighters = []
+
+    def rebuild(self, fighters):
+        self.fighters = fighters
+
+    def allow_movement(self, margin):
+        pass
+
+    def query(self, area):
+        width = self.width
+        areas = [area, area.move(width, 0), area.move(-width, 0)]
+        return [fighter for fighter in self.fighters if fighter.rect.collidelist(areas) >= 0]
+
+    def nearest(self, fighter, teams):
+        width = self.width
+        best = None
+        best_distance = width
+        for other in self.fighters:
+            if other.alive and teams[other] != teams[fighter]:
+                distance = abs(other.rect.centerx - fighter.rect.centerx) % width
+                distance = min(distance, width - distance)
+                if distance < best_distance:
+                    best, best_distance = other, distance
+        return best
+
+
+class ArenaState(FightState):
+    # fighter_1/fighter_2 stay None: the duel-only features (snapshots, clones, the lookahead AI)
+    # don't apply here. Every Sage's curse runs on its own, until its caster or target goes down.
+    def __init__(self, clock=pygame.time, seed=None, sound_on=True, phase=None):
+        FightState.__init__(self, clock, seed, sound_on)
+        self.fighters = []
+        self.teams = {}  # fighter -> team number
+        self.targets = {}  # fighter -> who it fought last tick
+        self.free_for_all = True
+        self.phase = phase or WrapBroadphase()
+
+    def add(self, fighter, team=None):
+        if team is not None:
+            self.free_for_all = False
+        self.fighters.append(fighter)
+        self.teams[fighter] = fighter.player if team is None else team
+        self.inputs = [0] * len(self.fighters)
+
+    def targets_in(self, fighter, area):
+        teams = self.teams
+        team = teams[fighter]
+        return [other for other in self.phase.query(area) if other.alive and teams[other] != team]
+
+    def alive_teams(self):
+        return {self.teams[fighter] for fighter in self.fighters if fighter.alive}
+
+    def step(self, surface=None):
+        fighters = self.fighters
+        for fighter in fighters:
+            fighter.last_pos = fighter.rect.topleft
+        self.handle_status_effects()
+        if self.intro_count > 0:
+            if self.clock.get_ticks() - self.last_count_update >= 1000 and not self.game_paused:
+                self.intro_count -= 1
+                self.last_count_update = self.clock.get_ticks()
+        elif not self.game_paused:
+            phase = self.phase
+            phase.rebuild(fighters)
+            targets = self.targets
+            for fighter in fighters:
+                # Someone to face even when no enemy is left standing
+                targets[fighter] = phase.nearest(fighter, self.teams) or targets.get(fighter) or fighter
+            phase.allow_movement(MARGIN)
+            for fighter in fighters:
+                fighter.move(SCREEN_WIDTH, SCREEN_HEIGHT, surface, targets[fighter], self.round_over)
+        # Attacks land during update() too, after everyone has moved
+        self.phase.rebuild(fighters)
+        for fighter in fighters:
+            fighter.update()
+        winner = None
+        if not self.round_over and not self.game_paused:
+            standing = self.alive_teams()
+            if len(standing) <= 1:
+                team = standing.pop() if standing else None
+                if team is None:
+                    winner = "Draw"
+                else:
+                    winner = f"Player {team}" if self.free_for_all else f"Team {team}"
+                self.round_over = True
+                self.round_over_time = self.clock.get_ticks()
+        return winner
+
+
+def player_order(fighter):
+    return fighter.player
+
+
+def create_arena(names, teams=None, seed=None, clock=None, humans=0, sound_on=False, phase=None,
+                 make_fighter=build_fighter):
+    # names: one character per fighter, spread evenly over the stage. teams: a team number per
+    # fighter (None for free-for-all). The first `humans` fighters are played by inputs.
+    fight = ArenaState(clock=clock or ManualClock(), seed=seed, sound_on=sound_on, phase=phase)
+    count = len(names)
+    for i, name in enumerate(names):
+        x = SCREEN_WIDTH * i // count + SCREEN_WIDTH // (2 * count) - 40
+        fighter = make_fighter(fight, i + 1, name, x, i % 2 == 1, is_ai=i >= humans)
+        fight.add(fighter, teams[i] if teams else None)
+    return fight
+
+
+def random_roster(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(list(CHARACTER_DATA)) for _ in range(count)]
+
+
+def arena_options(argv):
+    # python main.py --arena N [--teams T] [--fighter NAME]; None when not playing an arena
+    if "--arena" not in argv:
+        return None
+    parser = argparse.ArgumentParser(prog="main.py", description="Fight an arena of AI fighters")
+    parser.add_argument("--arena", type=int, required=True, metavar="N", help="number of fighters, you included")
+    parser.add_argument("--teams", type=int, default=0, help="number of teams (0 = free-for-all)")
+    parser.add_argument("--fighter", default="Knight", choices=list(CHARACTER_DATA), help="your character")
+    args = parser.parse_args(argv)
+    if args.arena < 2:
+        parser.error("an arena needs at least 2 fighters")
+    return args
+
+
+# -----------------------------------------------------------------------------------------------------------BENCHMARK
+# Headless AI arenas of growing size with the broadphase and with every pair tested. Both must
+# produce the same fight; the per-fighter cost should stay flat with the broadphase.
+def run_arena(count, seed, ticks, phase, team_count):
+    teams = [i % team_count + 1 for i in range(count)] if team_count else None
+    fight = create_arena(random_roster(count, seed), teams, seed, phase=phase)
+    fight.intro_count = 0
+    winner = None
+    start = time.perf_counter()
+    while fight.clock.frames < ticks and winner is None:
+        fight.clock.tick()
+        winner = fight.step()
+    elapsed = time.perf_counter() - start
+    health = [fighter.health for fighter in fight.fighters]
+    return elapsed, fight.clock.frames, winner, health
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless AI arenas with and without the broadphase")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument("--ticks", type=int, default=FPS * 20)
+    parser.add_argument("--teams", type=int, default=0, help="number of teams (0 = free-for-all)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'fighters':>8}{'ticks':>7}{'broadphase us/tick':>20}{'pairs us/tick':>15}"
+          f"{'us/fighter':>12}{'same fight':>12}")
+    for count in args.sizes:
+        fast = run_arena(count, args.seed, args.ticks, WrapBroadphase(), args.teams)
+        slow = run_arena(count, args.seed, args.ticks, BruteForcePhase(), args.teams)
+        same = fast[1:] == slow[1:]
+        print(f"{count:>8}{fast[1]:>7}{fast[0] / fast[1] * 1e6:>20.1f}{slow[0] / slow[1] * 1e6:>15.1f}"
+              f"{fast[0] / fast[1] / count * 1e6:>12.2f}{'yes' if same else 'NO':>12}")
+
+
+if __name__ == "__main__":
+    main()
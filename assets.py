@@ -0,0 +1,66 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+from engine import CHARACTER_DATA, load_animations
+
+
+# ----------------------------------------------------------------------------------------------------------ASSET LOADER
+# Decodes and scales every character's sprite sheets on worker threads while the player is still
+# in the menus. The character under the cursor jumps the queue, and create_fighter only waits on a
+# future that is usually finished already. Sounds are decoded into the sound bank by the same jobs.
+class AssetLoader:
+    def __init__(self, sound_bank, workers=2):
+        self.sound_bank = sound_bank
+        self.queue = queue.PriorityQueue()
+        self.futures = {}
+        self.priorities = {}
+        self.order = itertools.count()
+        self.lock = threading.Lock()
+        for _ in range(workers):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def request(self, char_name, priority=1):
+        # Lower priority numbers load first; asking again with a lower number re-queues the job
+        with self.lock:
+            future = self.futures.get(char_name)
+            if future is None:
+                future = self.futures[char_name] = Future()
+            elif future.running() or future.done() or priority >= self.priorities[char_name]:
+                return future
+            self.priorities[char_name] = priority
+            self.queue.put((priority, next(self.order), char_name))
+        return future
+
+    def preload_all(self):
+        for char_name in CHARACTER_DATA:
+            self.request(char_name)
+
+    def prioritize(self, char_name):
+        self.request(char_name, 0)
+
+    def wait(self, char_name):
+        # Returns the character's sound effect once its sheets are in the animation cache
+        return self.request(char_name, 0).result()
+
+    def work(self):
+        while True:
+            _, _, char_name = self.queue.get()
+            future = self.futures[char_name]
+            with self.lock:
+                # Stale entry left behind by a re-prioritized job
+                if future.running() or future.done():
+                    continue
+                future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self.load(char_name))
+            except Exception as e:
+                future.set_exception(e)
+
+    def load(self, char_name):
+        char_data = CHARACTER_DATA[char_name]
+        size, scale = char_data["data"][0], char_data["data"][1]
+        for sheet in dict.fromkeys((char_data["sheet"], char_data["sheet2"])):
+            load_animations(sheet, size, scale, char_data["animations"])
+            load_animations(sheet, size, scale, char_data["animations"], True)
+        return self.sound_bank.effect(char_data["sound"])
@@ -0,0 +1,133 @@
+import argparse
+import os
+import threading
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+# ------------------------------------------------------------------------------------------------------------SOUND BANK
+# Each effect file is decoded once, before its first fight, and shared by every fighter that uses
+# it. Effects play on a fixed pool of reserved channels, never on whatever channel the mixer hands
+# out. Each category has a voice limit: a full category restarts its own oldest voice. When the
+# whole pool is busy, the new sound takes over the oldest voice of no higher priority, or is
+# dropped. A play is one scan of the pool, however fast the attacks come.
+POOL_CHANNELS = 8
+CATEGORIES = {  # name -> (voice limit, priority)
+    "special": (3, 2),
+    "attack": (4, 1),
+}
+
+
+def effect_volume(path):
+    return 0.5 if "sword" in path else 0.75
+
+
+class Effect:
+    # What a fighter holds instead of a pygame Sound
+    __slots__ = ("bank", "sound")
+
+    def __init__(self, bank, sound):
+        self.bank = bank
+        self.sound = sound
+
+    def play(self, category="attack"):
+        return self.bank.play(self.sound, category)
+
+
+class SoundBank:
+    def __init__(self, channels=POOL_CHANNELS, categories=CATEGORIES):
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)  # Sound.play() elsewhere can't take these
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [None] * channels  # (category, priority, order) of what each channel last started
+        self.categories = categories
+        self.effects = {}
+        self.lock = threading.Lock()  # The asset loader threads ask for effects too
+        self.order = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def preload(self, paths):
+        for path in paths:
+            self.effect(path)
+
+    def effect(self, path):
+        with self.lock:
+            effect = self.effects.get(path)
+            if effect is None:
+                sound = pygame.mixer.Sound(path)
+                sound.set_volume(effect_volume(path))
+                effect = self.effects[path] = Effect(self, sound)
+            return effect
+
+    def play(self, sound, category):
+        # Returns the channel used, or None if the sound was dropped
+        limit, priority = self.categories[category]
+        channels, voices = self.channels, self.voices
+        free = oldest_same = victim = None
+        count = 0
+        for i, channel in enumerate(channels):
+            voice = voices[i]
+            if voice is None or not channel.get_busy():
+                voices[i] = None
+                if free is None:
+                    free = i
+                continue
+            if voice[0] == category:
+                count += 1
+                if oldest_same is None or voice[2] < voices[oldest_same][2]:
+                    oldest_same = i
+            if voice[1] <= priority and (victim is None or voice[1:] < voices[victim][1:]):
+                victim = i
+        if count >= limit:
+            slot = oldest_same
+        elif free is not None:
+            slot = free
+        elif victim is not None:
+            slot = victim
+        else:
+            self.dropped += 1
+            return None
+        if voices[slot] is not None:
+            self.stolen += 1
+        self.order += 1
+        voices[slot] = (category, priority, self.order)
+        channels[slot].play(sound)
+        self.played += 1
+        return channels[slot]
+
+    def active(self):
+        return sum(1 for channel, voice in zip(self.channels, self.voices) if voice and channel.get_busy())
+
+
+# -----------------------------------------------------------------------------------------------------------BENCHMARK
+# Attack spam on the dummy audio driver: every fighter firing an effect every tick
+def main():
+    parser = argparse.ArgumentParser(description="Time the sound bank under attack spam (dummy audio driver)")
+    parser.add_argument("--plays", type=int, default=20000)
+    parser.add_argument("--special-every", type=int, default=5, help="every Nth play is a special")
+    args = parser.parse_args()
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.mixer.init()
+    from engine import CHARACTER_DATA
+    bank = SoundBank()
+    bank.preload(dict.fromkeys(data["sound"] for data in CHARACTER_DATA.values()))
+    effects = list(bank.effects.values())
+    worst = 0.0
+    start = time.perf_counter()
+    for i in range(args.plays):
+        category = "special" if i % args.special_every == 0 else "attack"
+        before = time.perf_counter()
+        effects[i % len(effects)].play(category)
+        worst = max(worst, time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    print(f"{args.plays} plays: {elapsed / args.plays * 1e6:.1f} us average, {worst * 1e6:.0f} us worst, "
+          f"{bank.stolen} voices stolen, {bank.dropped} dropped, {bank.active()} of {len(bank.channels)} channels busy")
+    pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    main()
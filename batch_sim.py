@@ -0,0 +1,652 @@
+import argparse
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import (SCREEN_WIDTH, SCREEN_HEIGHT, FPS, CHARACTER_DATA, CHARACTER_STATS, SPECIAL_STUN,
+                    SPECIAL_GLOBAL_ATTACK, SPECIAL_DASH, SPECIAL_STEAL, SPECIAL_PULL, SPECIAL_CURSE, CURSE_DURATION,
+                    CURSE_PERIOD, CURSE_MAX_TICKS, CURSE_DAMAGE, CURSE_BACKLASH)
+from simulate import MAX_MATCH_TICKS, run_match
+
+# --------------------------------------------------------------------------------------------------------BATCH SIMULATOR
+# N headless AI-vs-AI matches held as NumPy arrays and advanced together, one tick per step().
+# Every per-fighter array has shape (2, N): row 0 is player 1, row 1 is player 2. Sides are still
+# processed one after another (move 1, move 2, update 1, update 2), exactly like FightState.step,
+# so only the random draws differ from the scalar Fighter rules, not their order of effect.
+STUN, GLOBAL_ATTACK, DASH, STEAL, PULL, CURSE = (SPECIAL_STUN, SPECIAL_GLOBAL_ATTACK, SPECIAL_DASH, SPECIAL_STEAL,
+                                                 SPECIAL_PULL, SPECIAL_CURSE)
+RECT_W, RECT_H = 80, 180  # Every fighter uses pygame.Rect(x, y, 80, 180)
+GROUND = SCREEN_HEIGHT - 110
+STUN_DURATION = 2000
+BLOCK_EXHAUST_DURATION = 2000
+ACTION_ATTACK1, ACTION_ATTACK2, ACTION_HIT, ACTION_DEATH, ACTION_BLOCK, ACTION_SPECIAL = 3, 4, 5, 6, 7, 8
+
+
+def build_stat_table():
+    names = list(CHARACTER_DATA)
+    columns = {
+        "health": [], "speed": [], "special_cooldown": [], "special_cast_time": [], "attack1": [],
+        "attack2": [], "special": [], "attack_width": [], "animation_speed": [], "special_type": [],
+        "block_stamina": [], "frame1": [], "frame2": [], "reaction_lo": [], "reaction_hi": [],
+        "dash_speed": [], "dash_distance": [], "steal_amount": [], "root_duration": [],
+        "pull_distance": [], "pull_speed": [], "curse_multiplier": [], "animations": []
+    }
+    for name in names:
+        stats = CHARACTER_STATS[name]
+        columns["health"].append(stats.health)
+        columns["speed"].append(stats.speed)
+        columns["special_cooldown"].append(stats.special_cooldown)
+        columns["special_cast_time"].append(stats.special_cast_time)
+        columns["attack1"].append(stats.damage[1])
+        columns["attack2"].append(stats.damage[2])
+        columns["special"].append(stats.damage[8])
+        # pygame.Rect truncates the float attack width
+        columns["attack_width"].append(int(stats.attack_range * RECT_W))
+        columns["animation_speed"].append(stats.animation_speed)
+        columns["special_type"].append(stats.special_type)
+        columns["block_stamina"].append(stats.block_stamina)
+        columns["frame1"].append(stats.damage_frames[1])
+        columns["frame2"].append(stats.damage_frames[2])
+        columns["reaction_lo"].append(stats.reaction_time[0])
+        columns["reaction_hi"].append(stats.reaction_time[1])
+        columns["dash_speed"].append(stats.dash_speed)
+        columns["dash_distance"].append(stats.dash_distance)
+        columns["steal_amount"].append(stats.steal_amount)
+        columns["root_duration"].append(stats.root_duration)
+        columns["pull_distance"].append(stats.pull_distance)
+        columns["pull_speed"].append(stats.pull_speed)
+        columns["curse_multiplier"].append(stats.curse_damage_multiplier)
+        columns["animations"].append(CHARACTER_DATA[name]["animations"])
+    table = {key: np.array(values) for key, values in columns.items()}
+    table["attack_range"] = np.array([CHARACTER_STATS[name].attack_range * RECT_W for name in names])
+    return table
+
+
+STAT_TABLE = build_stat_table()
+
+
+def rect_round(values):
+    # Assigning a float to a pygame.Rect attribute rounds half away from zero
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+class BatchFight:
+    def __init__(self, chars_1, chars_2, seed=None):
+        names = list(CHARACTER_DATA)
+        self.names_1 = list(chars_1)
+        self.names_2 = list(chars_2)
+        chars_1 = np.array([names.index(name) for name in chars_1])
+        chars_2 = np.array([names.index(name) for name in chars_2])
+        n = len(chars_1)
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.frames = 0
+        self.time = 0
+        chars = np.stack([chars_1, chars_2])
+        # Per-fighter constants gathered from the stat table
+        for key, column in STAT_TABLE.items():
+            if key != "animations":
+                setattr(self, key, column[chars])
+        self.animations = STAT_TABLE["animations"][chars]  # (2, N, 9) frame counts per action
+        # Per-fighter state
+        self.x = np.stack([np.full(n, 300), np.full(n, 600)]).astype(np.int64)
+        self.y = np.full((2, n), 310, dtype=np.int64)
+        self.flip = np.stack([np.zeros(n, bool), np.ones(n, bool)])
+        self.vel_y = np.zeros((2, n), dtype=np.int64)
+        self.health = self.health.astype(np.int64)
+        self.alive = np.ones((2, n), bool)
+        self.running = np.zeros((2, n), bool)
+        self.blocking = np.zeros((2, n), bool)
+        self.hit = np.zeros((2, n), bool)
+        self.attacking = np.zeros((2, n), bool)
+        self.attack_type = np.zeros((2, n), dtype=np.int64)
+        self.attack_cooldown = np.zeros((2, n), dtype=np.int64)
+        self.attack_start_time = np.zeros((2, n), dtype=np.int64)
+        self.damage_applied = np.zeros((2, n), bool)
+        self.attack_cancelled = np.zeros((2, n), bool)
+        self.current_block_stamina = self.block_stamina.astype(np.int64)
+        self.block_exhausted = np.zeros((2, n), bool)
+        self.block_exhaust_start = np.zeros((2, n), dtype=np.int64)
+        self.dashing = np.zeros((2, n), bool)
+        self.dash_direction = np.ones((2, n), dtype=np.int64)
+        self.has_dash_contact = np.zeros((2, n), bool)
+        self.dash_distance_traveled = np.zeros((2, n), dtype=np.int64)
+        self.stunned = np.zeros((2, n), bool)
+        self.stun_start_time = np.zeros((2, n), dtype=np.int64)
+        self.rooted = np.zeros((2, n), bool)
+        self.root_start_time = np.zeros((2, n), dtype=np.int64)
+        self.being_pulled = np.zeros((2, n), bool)
+        self.pull_target_x = np.zeros((2, n), dtype=np.int64)
+        self.special_last_used = np.zeros((2, n), dtype=np.int64)
+        self.block_attempt_time = np.zeros((2, n), dtype=np.int64)
+        self.attack_detected = np.zeros((2, n), bool)
+        self.action = np.zeros((2, n), dtype=np.int64)
+        self.frame_index = np.zeros((2, n), dtype=np.int64)
+        self.update_time = np.zeros((2, n), dtype=np.int64)
+        # Curses stack, and a Sage's cooldown outlasts its curse: one curse slot per caster, on the other side
+        self.curse_active = np.zeros((2, n), bool)
+        self.curse_start_time = np.zeros((2, n), dtype=np.int64)
+        self.curse_last_damage = np.zeros((2, n), dtype=np.int64)
+        self.curse_ticks = np.zeros((2, n), dtype=np.int64)
+        # Per-match state: the result
+        self.live = np.ones(n, bool)
+        # Results stay indexed by the original match number; everything else is compacted as matches end
+        self.match_ids = np.arange(n)
+        self.result_winner = np.zeros(n, dtype=np.int64)  # 0 = draw, 1 or 2 = winning player
+        self.result_frames = np.zeros(n, dtype=np.int64)
+        self.result_health = np.zeros((2, n), dtype=np.int64)
+
+    # ------------------------------------------------------------------------------------------------------------HELPERS
+    def centerx(self, side):
+        return self.x[side] + RECT_W // 2
+
+    def set_action(self, side, mask, new_action):
+        change = mask & (self.action[side] != new_action)
+        self.action[side][change] = new_action
+        self.frame_index[side][change] = 0
+        self.update_time[side][change] = self.time
+
+    def attack_area_hits(self, side):
+        # Attack area in front of the fighter, tested against the opponent's rect
+        other = 1 - side
+        width = self.attack_width[side]
+        left = self.centerx(side) - width * self.flip[side]
+        return ((left < self.x[other] + RECT_W) & (self.x[other] < left + width) &
+                (self.y[side] < self.y[other] + RECT_H) & (self.y[other] < self.y[side] + RECT_H))
+
+    def exhaust_block(self, side, mask):
+        exhausted = mask & (self.current_block_stamina[side] <= 0)
+        self.block_exhausted[side][exhausted] = True
+        self.block_exhaust_start[side][exhausted] = self.time
+        self.blocking[side][exhausted] = False
+        self.health[side][exhausted] -= np.abs(self.current_block_stamina[side][exhausted])
+        self.hit[side][exhausted] = True
+        return exhausted
+
+    def cancel_attack(self, side, mask):
+        cancel = mask & self.attacking[side]
+        self.attack_cancelled[side][cancel] = True
+        self.attacking[side][cancel] = False
+        self.dashing[side][cancel] = False
+
+    # ------------------------------------------------------------------------------------------------------------COMBAT
+    def initiate_attack(self, side, mask, attack_type):
+        other = 1 - side
+        mask = mask & ~self.hit[side]
+        if not mask.any():
+            return
+        t = self.time
+        # Notifying the (AI) target about an upcoming attack
+        low = self.reaction_lo[other][mask]
+        high = self.reaction_hi[other][mask]
+        delay = low + np.floor(self.rng.random(low.size) * (high - low + 1)).astype(np.int64)
+        self.block_attempt_time[other][mask] = t + delay
+        self.attack_detected[other][mask] = True
+        attack_type = np.broadcast_to(attack_type, mask.shape)
+        special = mask & (attack_type == 8) & (t - self.special_last_used[side] >= self.special_cooldown[side])
+        normal = mask & (attack_type != 8) & (self.attack_cooldown[side] == 0)
+        started = special | normal
+        self.attacking[side][started] = True
+        self.attack_type[side][started] = attack_type[started]
+        self.attack_start_time[side][started] = t
+        self.damage_applied[side][started] = False
+        self.attack_cancelled[side][started] = False
+        self.special_last_used[side][special] = 0
+        self.apply_special_effect(side, special & (self.special_cast_time[side] == 0))
+        first_frame = normal & (((attack_type == 1) & (self.frame1[side] == 1)) |
+                                ((attack_type == 2) & (self.frame2[side] == 1)))
+        self.apply_attack_damage(side, first_frame)
+
+    def apply_attack_damage(self, side, mask):
+        other = 1 - side
+        attack_type = self.attack_type[side]
+        hits = (mask & ((attack_type == 1) | (attack_type == 2) | (attack_type == 8)) &
+                ~self.attack_cancelled[side] & self.attack_area_hits(side))
+        if hits.any():
+            multiplier = np.where(self.curse_active[side], self.curse_multiplier[side], 1.0)
+            base = np.where(attack_type == 1, self.attack1[side],
+                            np.where(attack_type == 2, self.attack2[side], self.special[side]))
+            damage = (base * multiplier).astype(np.int64)
+            blocked = hits & self.blocking[other] & ~self.block_exhausted[other]
+            self.current_block_stamina[other][blocked] -= np.minimum(
+                damage, self.current_block_stamina[other])[blocked]
+            self.exhaust_block(other, blocked)
+            open_hit = hits & ~blocked
+            self.health[other][open_hit] -= damage[open_hit]
+            self.hit[other][open_hit] = True
+            self.stunned[other][hits] = False
+        self.damage_applied[side][mask] = True
+
+    def apply_special_effect(self, side, mask):
+        other = 1 - side
+        mask = mask & ~self.attack_cancelled[side]
+        if not mask.any():
+            return
+        t = self.time
+        special_type = self.special_type[side]
+        applied = np.zeros(self.n, bool)
+        # Mage: screen-wide attack
+        cast = mask & (special_type == GLOBAL_ATTACK)
+        blocked = cast & self.blocking[other] & ~self.block_exhausted[other]
+        self.current_block_stamina[other][blocked] -= np.minimum(
+            self.special[side], self.current_block_stamina[other])[blocked]
+        self.exhaust_block(other, blocked)
+        open_hit = cast & ~blocked
+        self.health[other][open_hit] -= self.special[side][open_hit]
+        self.hit[other][open_hit] = True
+        applied |= cast
+        # Knight: stun
+        cast = mask & (special_type == STUN) & ~self.stunned[other]
+        self.stunned[other][cast] = True
+        self.stun_start_time[other][cast] = t
+        self.cancel_attack(other, cast)
+        applied |= cast
+        # Warlock: health steal in front of the caster
+        cast = mask & (special_type == STEAL)
+        in_area = cast & self.attack_area_hits(side)
+        blocked = in_area & self.blocking[other] & ~self.block_exhausted[other]
+        self.current_block_stamina[other][blocked] -= np.minimum(
+            self.steal_amount[side], self.current_block_stamina[other])[blocked]
+        broken = self.exhaust_block(other, blocked)
+        remaining = np.abs(self.current_block_stamina[other])
+        steal = np.minimum(self.steal_amount[side], self.health[other] + remaining)
+        self.health[side][broken] = np.minimum(100, self.health[side] + steal)[broken]
+        open_hit = in_area & ~blocked
+        steal = np.minimum(self.steal_amount[side], self.health[other])
+        self.health[other][open_hit] -= steal[open_hit]
+        self.health[side][open_hit] = np.minimum(100, self.health[side] + steal)[open_hit]
+        self.hit[other][open_hit] = True
+        applied |= cast
+        # Sage: curse on the opponent
+        cast = mask & (special_type == CURSE)
+        self.curse_active[side][cast] = True
+        self.curse_start_time[side][cast] = t
+        self.curse_last_damage[side][cast] = t
+        self.curse_ticks[side][cast] = 0
+        applied |= cast
+        # Ranger: screen dash
+        cast = mask & (special_type == DASH)
+        self.dashing[side][cast] = True
+        self.has_dash_contact[side][cast] = False
+        self.dash_direction[side][cast] = np.where(self.flip[side], -1, 1)[cast]
+        self.dash_distance_traveled[side][cast] = 0
+        applied |= cast
+        # Guardian: pull and root
+        cast = mask & (special_type == PULL)
+        direction = np.where(self.centerx(side) < self.centerx(other), 1, -1)
+        self.being_pulled[other][cast] = True
+        self.pull_target_x[other][cast] = (self.centerx(side) + self.pull_distance[side] * direction)[cast]
+        self.hit[other][cast] = True
+        self.cancel_attack(other, cast)
+        applied |= cast
+        self.damage_applied[side][applied] = True
+        self.special_last_used[side][applied] = t
+
+    # ------------------------------------------------------------------------------------------------------------MOVE
+    def move(self, side):
+        other = 1 - side
+        t = self.time
+        speed = self.speed[side]
+        self.running[side][self.live] = False
+        self.blocking[side][self.live] = False
+        stunned = self.live & self.stunned[side]
+        self.stunned[side][stunned & (t - self.stun_start_time[side] >= STUN_DURATION)] = False
+        active = self.live & ~stunned
+        self.rooted[side][active & self.rooted[side] &
+                          (t - self.root_start_time[side] >= self.root_duration[side])] = False
+        exhausted = active & self.block_exhausted[side]
+        recovered = exhausted & (t - self.block_exhaust_start[side] >= BLOCK_EXHAUST_DURATION)
+        self.block_exhausted[side][recovered] = False
+        self.current_block_stamina[side][recovered] = self.block_stamina[side][recovered]
+        # Being pulled by a Guardian
+        pulled = active & self.being_pulled[side]
+        center = self.centerx(side)
+        still_pulled = pulled & (np.abs(center - self.pull_target_x[side]) > self.pull_speed[side])
+        pull_step = np.where(center < self.pull_target_x[side], self.pull_speed[side], -self.pull_speed[side])
+        self.x[side][still_pulled] += pull_step[still_pulled]
+        arrived = pulled & ~still_pulled
+        self.being_pulled[side][arrived] = False
+        self.rooted[side][arrived] = True
+        self.root_start_time[side][arrived] = t
+        self.hit[side][pulled] = True
+        active &= ~still_pulled
+
+        dx = np.zeros(self.n)
+        special_type = self.special_type[side]
+        attack_range = self.attack_range[side]
+        caster = self.curse_active[side]
+        # Reactive blocking and the Sage/Guardian stance, before the main AI
+        thinking = active & ~self.attacking[side] & ~self.hit[side]
+        react = (thinking & self.attack_detected[side] & (t >= self.block_attempt_time[side]) &
+                 ~self.block_exhausted[side] & (self.current_block_stamina[side] > 0))
+        self.blocking[side][react] = True
+        self.attack_detected[side][react] = False
+        delta = self.centerx(other) - self.centerx(side)
+        distance = np.abs(delta)
+        toward = np.where(delta > 0, 1, -1)
+        sage = thinking & (special_type == CURSE)
+        optimal = attack_range * 0.8
+        aggressive = sage & caster
+        closing = aggressive & (distance > optimal * 1.1)
+        backing = aggressive & ~closing & (distance < optimal * 0.7)
+        dx[closing] = (speed * toward * 1.2)[closing]
+        dx[backing] = (-speed * toward * 0.5)[backing]
+        self.running[side][closing | backing] = True
+        in_range = aggressive & (distance < attack_range * 1.2) & (self.attack_cooldown[side] == 0)
+        roll, choice = self.rng.random(self.n), self.rng.random(self.n)
+        self.initiate_attack(side, in_range & (roll < 0.8), np.where(choice < 0.6, 1, 2))
+        wary = sage & ~caster & (distance < attack_range * 1.5)
+        self.blocking[side][wary & self.attacking[other]] = True
+        retreat = wary & ~self.attacking[other] & ~self.blocking[side]
+        dx[retreat] = np.where(delta > 0, -speed, speed)[retreat]
+        self.running[side][retreat] = True
+        guard = (thinking & (special_type == PULL) &
+                 (t - self.special_last_used[side] < self.special_cooldown[side]) &
+                 (distance < attack_range * 1.5))
+        self.blocking[side][guard] = True
+
+        # Main AI, with distances measured the short way around the wrapping stage
+        thinking = active & ~self.attacking[side] & self.alive[side] & ~self.hit[side]
+        wrapped = SCREEN_WIDTH - distance
+        use_wrapped = wrapped < distance
+        distance = np.where(use_wrapped, wrapped, distance)
+        direction = np.where(use_wrapped, -toward, toward)
+        caster = self.curse_active[side]
+        ranged = (special_type == GLOBAL_ATTACK) | (special_type == STEAL) | ((special_type == CURSE) & caster)
+        optimal = np.where(ranged, attack_range * 1.2, attack_range * 0.9)
+        ready = t - self.special_last_used[side] >= self.special_cooldown[side]
+        cooled = self.attack_cooldown[side] == 0
+        free = ~self.blocking[side]
+        roll, choice = self.rng.random(self.n), self.rng.random(self.n)
+        specials = np.zeros(self.n, bool)
+        normals = np.zeros(self.n, bool)
+        attack_choice = np.ones(self.n, dtype=np.int64)
+        forward = np.zeros(self.n)  # Speed multiplier toward the opponent (negative backs off)
+
+        def walk(mask, amount):
+            forward[mask] = amount if np.isscalar(amount) else amount[mask]
+
+        # Knight, Mage and Ranger share the same shape with different thresholds
+        for kind, special_reach, normal_chance, near, far, far_speed in (
+                (STUN, 1.5, 0.7, 0.8, 1.0, 1.0),
+                (GLOBAL_ATTACK, 1.5, 0.6, 0.8, 1.2, 0.8),
+                (DASH, 2.0, 0.7, 0.8, 1.0, 1.0)):
+            mine = thinking & (special_type == kind)
+            special = mine & ready & (distance > attack_range * special_reach)
+            normal = mine & ~special & (distance < attack_range * 1.1) & cooled
+            moving = mine & ~special & ~normal & free
+            specials |= special
+            normals |= normal
+            attack_choice[normal] = np.where(roll < normal_chance, 1, 2)[normal]
+            walk(moving & (distance > optimal * far), far_speed)
+            walk(moving & ~(distance > optimal * far) & (distance < optimal * near), -1.0)
+        # Warlock
+        mine = thinking & (special_type == STEAL)
+        specials |= mine & ready & (optimal * 0.9 < distance) & (distance < optimal * 1.1)
+        normal = mine & (distance < attack_range * 1.1) & cooled
+        moving = mine & ~normal & free
+        normals |= normal
+        attack_choice[normal] = np.where(roll < 0.6, 1, 2)[normal]
+        walk(moving & (distance > optimal * 1.1), 0.7)
+        walk(moving & ~(distance > optimal * 1.1) & (distance < optimal * 0.9), -0.7)
+        # Guardian
+        mine = thinking & (special_type == PULL)
+        chase = mine & self.rooted[other]
+        close = distance < attack_range * 1.1
+        normal = chase & close & cooled
+        normals |= normal
+        attack_choice[normal] = np.where(roll < 0.8, 1, 2)[normal]
+        walk(chase & ~close & free, 1.0)
+        specials |= mine & ~self.rooted[other] & ready
+        waiting = mine & ~self.rooted[other] & ~ready & free
+        walk(waiting & (distance < attack_range * 2), -1.0)
+        walk(waiting & ~(distance < attack_range * 2) & (distance > attack_range * 3), 0.5)
+        # Sage
+        mine = thinking & (special_type == CURSE)
+        aggressive = mine & caster
+        in_range = aggressive & (distance < attack_range * 1.2) & cooled
+        normal = in_range & (roll < 0.8)
+        normals |= normal
+        attack_choice[normal] = np.where(choice < 0.7, 1, 2)[normal]
+        moving = aggressive & ~in_range & free
+        walk(moving & (distance > optimal * 1.1), 1.2)
+        walk(moving & ~(distance > optimal * 1.1) & (distance < optimal * 0.7), -0.8)
+        defensive = mine & ~caster
+        specials |= defensive & ready & (distance > attack_range * 2.5)
+        holding = defensive & ready & ~(distance > attack_range * 2.5)
+        self.blocking[side][holding & self.attacking[other]] = True
+        walk(holding & ~self.attacking[other] & free, -1.0)
+        normal = defensive & ~ready & (distance < attack_range * 1.1) & cooled
+        normals |= normal
+        attack_choice[normal] = np.where(roll < 0.6, 1, 2)[normal]
+
+        walking = forward != 0
+        dx[walking] = (speed * direction * forward)[walking]
+        self.running[side][walking] = True
+        self.initiate_attack(side, specials, 8)
+        self.initiate_attack(side, normals, attack_choice)
+
+        # Ranger dash, otherwise gravity
+        dashing = active & self.dashing[side] & ~self.hit[side]
+        dash_dx = self.dash_speed[side] * self.dash_direction[side] * 3
+        dx[dashing] = dash_dx[dashing]
+        self.x[side][dashing] += dash_dx[dashing]
+        self.dash_distance_traveled[side][dashing] += np.abs(dash_dx)[dashing]
+        contact = (dashing & ~self.has_dash_contact[side] &
+                   (self.x[side] < self.x[other] + RECT_W) & (self.x[other] < self.x[side] + RECT_W) &
+                   (self.y[side] < self.y[other] + RECT_H) & (self.y[other] < self.y[side] + RECT_H))
+        self.has_dash_contact[side][contact] = True
+        open_hit = contact & (~self.blocking[other] | self.block_exhausted[other])
+        self.health[other][open_hit] -= self.special[side][open_hit]
+        self.hit[other][open_hit] = True
+        self.stunned[other][open_hit] = False
+        blocked = contact & ~open_hit
+        self.current_block_stamina[other][blocked] -= self.special[side][blocked]
+        broken = blocked & (self.current_block_stamina[other] <= 0)
+        self.block_exhausted[other][broken] = True
+        self.block_exhaust_start[other][broken] = t
+        self.blocking[other][broken] = False
+        finished = dashing & (self.dash_distance_traveled[side] >= self.dash_distance[side])
+        self.dashing[side][finished] = False
+        self.has_dash_contact[side][finished] = False
+        self.dash_distance_traveled[side][finished] = 0
+        falling = active & ~dashing
+        self.vel_y[side][falling] += 2
+        dy = np.where(falling, self.vel_y[side], 0)
+
+        # Wrapping around the screen edges, landing, facing and cooldown
+        off_left = active & (self.x[side] + RECT_W < 0)
+        off_right = active & ~off_left & (self.x[side] > SCREEN_WIDTH)
+        self.x[side][off_left] = SCREEN_WIDTH
+        self.x[side][off_right] = -RECT_W
+        landing = active & (self.y[side] + RECT_H + dy > GROUND)
+        self.vel_y[side][landing] = 0
+        dy[landing] = (GROUND - self.y[side] - RECT_H)[landing]
+        delta = self.centerx(other) - self.centerx(side)
+        facing_direct = np.abs(delta) < SCREEN_WIDTH - np.abs(delta)
+        self.flip[side][active] = np.where(facing_direct, delta < 0, delta > 0)[active]
+        cooling = active & (self.attack_cooldown[side] > 0)
+        self.attack_cooldown[side][cooling] -= 1
+        stepping = active & ~self.rooted[side] & ~self.being_pulled[side] & ~self.dashing[side]
+        self.x[side][stepping] = rect_round(self.x[side] + dx)[stepping]
+        self.y[side][active] += dy[active]
+
+    # ----------------------------------------------------------------------------------------------------------UPDATE
+    def update(self, side):
+        t = self.time
+        live = self.live
+        interrupted = live & self.hit[side] & self.attacking[side]
+        self.attacking[side][interrupted] = False
+        self.attack_cancelled[side][interrupted] = True
+        self.dashing[side][interrupted] = False
+        self.set_action(side, interrupted, ACTION_HIT)
+        live = live & ~interrupted
+
+        dead = live & (self.health[side] <= 0)
+        self.health[side][dead] = 0
+        self.alive[side][dead] = False
+        self.set_action(side, dead, ACTION_DEATH)
+        rest = live & ~dead
+        hurt = rest & self.hit[side]
+        self.set_action(side, hurt, ACTION_HIT)
+        self.stunned[side][hurt] = False
+        rest &= ~hurt
+        dashing = rest & self.dashing[side]
+        self.set_action(side, dashing, ACTION_SPECIAL)
+        rest &= ~dashing
+        attacking = rest & self.attacking[side]
+        pending = ~self.damage_applied[side]
+        for attack_type, action, frame in ((1, ACTION_ATTACK1, self.frame1[side]),
+                                           (2, ACTION_ATTACK2, self.frame2[side])):
+            swing = attacking & (self.attack_type[side] == attack_type)
+            self.set_action(side, swing, action)
+            self.apply_attack_damage(side, swing & (self.frame_index[side] + 1 == frame) & pending)
+        special = attacking & (self.attack_type[side] == 8)
+        self.set_action(side, special, ACTION_SPECIAL)
+        charging = special & ~self.damage_applied[side] & ~self.attack_cancelled[side]
+        casting = charging & (t - self.attack_start_time[side] < self.special_cast_time[side])
+        last_frame = self.animations[side, :, ACTION_SPECIAL] - 1
+        self.frame_index[side][casting & (self.frame_index[side] >= last_frame)] = 0
+        self.apply_special_effect(side, charging & ~casting)
+        rest &= ~attacking
+        blocking = rest & self.blocking[side]
+        self.set_action(side, blocking, ACTION_BLOCK)
+        rest &= ~blocking
+        # The AI never jumps, so idle and run are the only remaining actions
+        self.set_action(side, rest & self.running[side], 1)
+        self.set_action(side, rest & ~self.running[side], 0)
+
+        holding = (live & self.attacking[side] & (self.attack_type[side] == 8) & ~self.damage_applied[side] &
+                   (t - self.attack_start_time[side] < self.special_cast_time[side]))
+        advance = live & ~holding & (t - self.update_time[side] > self.animation_speed[side])
+        self.frame_index[side][advance] += 1
+        self.update_time[side][advance] = t
+        steps = np.take_along_axis(self.animations[side], self.action[side][:, None], axis=1)[:, 0]
+        finished = live & (self.frame_index[side] >= steps)
+        self.frame_index[side][finished & ~self.alive[side]] = (steps - 1)[finished & ~self.alive[side]]
+        looped = finished & self.alive[side]
+        self.frame_index[side][looped] = 0
+        action = self.action[side]
+        unresolved = ~self.damage_applied[side] & ~self.attack_cancelled[side]
+        swing_end = looped & ((action == ACTION_ATTACK1) | (action == ACTION_ATTACK2))
+        special_end = looped & (action == ACTION_SPECIAL)
+        late_special = special_end & unresolved & (t - self.attack_start_time[side] >= self.special_cast_time[side])
+        self.apply_attack_damage(side, swing_end & unresolved)
+        self.apply_special_effect(side, late_special)
+        self.attacking[side][swing_end | special_end] = False
+        self.damage_applied[side][swing_end | special_end] = True
+        self.attack_cooldown[side][swing_end] = 20
+        recovered = looped & (action == ACTION_HIT)
+        self.hit[side][recovered] = False
+        self.attack_cooldown[side][recovered] = 20
+        self.blocking[side][looped & (action == ACTION_BLOCK)] = False
+
+    # ------------------------------------------------------------------------------------------------------------STEP
+    def handle_sage_effect(self):
+        t = self.time
+        someone_dead = ~self.alive[0] | ~self.alive[1]
+        for side in (0, 1):
+            other = 1 - side
+            active = self.curse_active[side]
+            active[self.live & someone_dead] = False
+            cursed = self.live & active
+            expired = cursed & (t - self.curse_start_time[side] >= CURSE_DURATION)
+            active[expired] = False
+            ticking = (cursed & ~expired & (t - self.curse_last_damage[side] >= CURSE_PERIOD) &
+                       (self.curse_ticks[side] < CURSE_MAX_TICKS))
+            self.health[other][ticking & self.alive[other]] -= CURSE_DAMAGE
+            self.health[side][ticking & self.alive[side]] -= CURSE_BACKLASH
+            self.curse_last_damage[side][ticking] = t
+            self.curse_ticks[side][ticking] += 1
+
+    def step(self):
+        self.frames += 1
+        self.time = self.frames * 1000 // FPS
+        self.handle_sage_effect()
+        self.move(0)
+        self.move(1)
+        self.update(0)
+        self.update(1)
+        p2_wins = self.live & ~self.alive[0]
+        p1_wins = self.live & self.alive[0] & ~self.alive[1]
+        self.result_winner[self.match_ids[p2_wins]] = 2
+        self.result_winner[self.match_ids[p1_wins]] = 1
+        ended = p1_wins | p2_wins
+        self.record(ended)
+        self.live &= ~ended
+        if self.n > 64 and np.count_nonzero(self.live) * 2 <= self.n:
+            self.compact()
+
+    def record(self, mask):
+        self.result_frames[self.match_ids[mask]] = self.frames
+        self.result_health[:, self.match_ids[mask]] = self.health[:, mask]
+
+    def compact(self):
+        # Dropping finished matches so each step only touches fights that are still running
+        keep = self.live
+        for name, value in list(vars(self).items()):
+            if isinstance(value, np.ndarray) and not name.startswith("result_"):
+                setattr(self, name, value[keep] if value.ndim == 1 else value[:, keep])
+        self.n = len(self.match_ids)
+
+    def run(self, max_ticks=MAX_MATCH_TICKS):
+        while self.live.any() and self.frames < max_ticks:
+            self.step()
+        self.record(self.live)
+        return self
+
+    def results(self):
+        winners = {0: "Draw", 1: "Player 1", 2: "Player 2"}
+        return [{
+            "fighter1": self.names_1[i],
+            "fighter2": self.names_2[i],
+            "winner": winners[int(self.result_winner[i])],
+            "ticks": int(self.result_frames[i]),
+            "duration": int(self.result_frames[i]) * 1000 // FPS,
+            "health1": int(max(0, self.result_health[0][i])),
+            "health2": int(max(0, self.result_health[1][i])),
+        } for i in range(len(self.names_1))]
+
+
+def run_batch(char_1, char_2, matches, seed=None, max_ticks=MAX_MATCH_TICKS):
+    return BatchFight([char_1] * matches, [char_2] * matches, seed).run(max_ticks).results()
+
+
+def summarize(results):
+    n = len(results) or 1
+    return {
+        "win_rate": sum(r["winner"] == "Player 1" for r in results) / n,
+        "draw_rate": sum(r["winner"] == "Draw" for r in results) / n,
+        "avg_duration_ms": sum(r["duration"] for r in results) / n,
+        "avg_health1": sum(r["health1"] for r in results) / n,
+        "avg_health2": sum(r["health2"] for r in results) / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized AI-vs-AI matches")
+    parser.add_argument("fighter1", choices=list(CHARACTER_DATA))
+    parser.add_argument("fighter2", choices=list(CHARACTER_DATA))
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", type=int, default=0, metavar="N",
+                        help="also play N scalar Fighter matches and print both summaries")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = summarize(run_batch(args.fighter1, args.fighter2, args.matches, args.seed))
+    elapsed = time.perf_counter() - start
+    print(f"{args.fighter1} vs {args.fighter2}: {args.matches} batched matches in {elapsed:.2f}s")
+    print("  batch  " + "  ".join(f"{key}={value:.3f}" for key, value in summary.items()))
+    if args.compare:
+        start = time.perf_counter()
+        scalar = summarize([run_match(args.fighter1, args.fighter2, seed=args.seed + i)
+                            for i in range(args.compare)])
+        elapsed = time.perf_counter() - start
+        print("  scalar " + "  ".join(f"{key}={value:.3f}" for key, value in scalar.items()))
+        print(f"  ({args.compare} scalar matches in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
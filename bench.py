@@ -0,0 +1,120 @@
+import argparse
+import json
+import time
+from array import array
+from engine import FPS, CHARACTER_DATA
+
+# -----------------------------------------------------------------------------------------------------FRAME BENCHMARK
+# python main.py --bench plays a fixed set of seeded AI-vs-AI fights through the game's own frame
+# loop: draw_bg, HUD, Fighter.draw and display.update, with the frame rate uncapped. Each frame
+# runs exactly one fight tick, so every pairing is the same fight and the same number of frames on
+# any machine, and only the frame times differ. Run it with the real SDL drivers to test cabinet
+# hardware, or with SDL_VIDEODRIVER=dummy to check an optimization.
+BENCH_SEED = 2024
+BENCH_TICKS = 20 * FPS  # Frames per pairing; fights that end sooner keep rendering the knockout
+
+
+def default_pairings():
+    # Every character once on each side, never a mirror match
+    names = list(CHARACTER_DATA)
+    return [(names[i], names[(i + 1) % len(names)]) for i in range(len(names))]
+
+
+def pairing(text):
+    names = text.split(":")
+    if len(names) != 2 or any(name not in CHARACTER_DATA for name in names):
+        raise argparse.ArgumentTypeError(f"expected FIGHTER:FIGHTER from {', '.join(CHARACTER_DATA)}")
+    return tuple(names)
+
+
+def bench_options(argv):
+    # python main.py --bench [--pairings A:B ...] [--ticks N] [--seed S] [--min-fps F] [--json FILE];
+    # None when not benchmarking
+    if "--bench" not in argv:
+        return None
+    parser = argparse.ArgumentParser(prog="main.py", description="Benchmark real frames of seeded AI-vs-AI fights")
+    parser.add_argument("--bench", action="store_true", required=True)
+    parser.add_argument("--pairings", type=pairing, nargs="+", default=default_pairings(), metavar="A:B")
+    parser.add_argument("--ticks", type=int, default=BENCH_TICKS, help="frames per pairing")
+    parser.add_argument("--seed", type=int, default=BENCH_SEED)
+    parser.add_argument("--min-fps", type=float, help="fail when a pairing's 1%% low is below this")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def frame_stats(times):
+    # Frame times in seconds -> average FPS, 1% low (the average FPS of the slowest 1% of frames)
+    # and frame-time percentiles in milliseconds
+    ms = sorted(t * 1000 for t in times)
+    worst = ms[-max(1, len(ms) // 100):]
+    total = sum(ms)
+
+    def percentile(p):
+        return ms[min(len(ms) - 1, len(ms) * p // 100)]
+
+    return {
+        "frames": len(ms),
+        "avg_fps": len(ms) * 1000 / total if total else 0.0,
+        "low_1_fps": len(worst) * 1000 / sum(worst) if sum(worst) else 0.0,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ms[-1],
+    }
+
+
+class FrameBench:
+    def __init__(self, args):
+        self.pairings = args.pairings
+        self.ticks = args.ticks
+        self.seed = args.seed
+        self.min_fps = args.min_fps
+        self.json_path = args.json
+        self.index = 0
+        self.times = array('d')
+        self.all_times = array('d')
+        self.results = []
+        self.last = None
+
+    @property
+    def pairing(self):
+        return self.pairings[self.index]
+
+    def start(self):
+        # Call once the pairing's fight is set up, so building it isn't counted as a frame
+        self.times = array('d')
+        self.last = time.perf_counter()
+
+    def frame(self):
+        now = time.perf_counter()
+        self.times.append(now - self.last)
+        self.last = now
+
+    def finish(self, fight):
+        # Records the pairing that just ran; False once every pairing has. The final health shows
+        # that two runs played the same fights.
+        stats = frame_stats(self.times)
+        stats["pairing"] = f"{self.pairing[0]} vs {self.pairing[1]}"
+        stats["health"] = [fight.fighter_1.health, fight.fighter_2.health]
+        self.results.append(stats)
+        self.all_times += self.times
+        self.index += 1
+        return self.index < len(self.pairings)
+
+    def passed(self):
+        return self.min_fps is None or all(stats["low_1_fps"] >= self.min_fps for stats in self.results)
+
+    def report(self):
+        print(f"{'pairing':<22}{'frames':>8}{'avg FPS':>10}{'1% low':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'max ms':>9}{'HP':>10}")
+        total = dict(frame_stats(self.all_times), pairing="all")
+        for stats in self.results + [total]:
+            print(f"{stats['pairing']:<22}{stats['frames']:>8}{stats['avg_fps']:>10.1f}{stats['low_1_fps']:>9.1f}"
+                  f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+                  f"{'/'.join(map(str, stats.get('health', ()))):>10}")
+        if self.min_fps is not None:
+            print(f"{'PASS' if self.passed() else 'FAIL'}: 1% lows against a minimum of {self.min_fps:g} FPS")
+        if self.json_path:
+            with open(self.json_path, 'w') as f:
+                json.dump({"seed": self.seed, "ticks": self.ticks, "pairings": self.results, "all": total}, f,
+                          indent=1)
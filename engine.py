@@ -0,0 +1,1237 @@
+import heapq
+import operator
+import random
+import struct
+import pygame
+from ai import POLICIES, Perception
+
+# --------------------------------------------------------------------------------------------------------GAME CONSTANTS
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 600
+FPS = 60
+ROUND_OVER_COOLDOWN = 2000
+# --------------------------------------------------------------------------------------------------------CHARACTER DATA
+CHARACTER_DATA = {
+    "Knight": {
+        "data": [162, 4, [72, 56]],
+        "animations": [10, 8, 1, 7, 7, 3, 7, 3, 3],
+        "sheet": "assets/images/knight/Sprites/warrior1.png",
+        "sheet2": "assets/images/knight/Sprites/warrior1.png",
+        "sound": "assets/audio/sword.wav",
+        "stats": {
+            "health": 100,
+            "speed": 9,
+            "special_cooldown": 6000,
+            "special_cast_time": 500,
+            "damage": {"attack1": 15, "attack2": 10, "special": 0},
+            "attack_range": 2,
+            "animation_speed": 60,
+            "special_type": "global_stun",
+            "block_stamina": 60,
+            "damage_frames": {"attack1": 5, "attack2": 3},
+            "reaction_time": (50, 250)
+        }
+    },
+    "Mage": {
+        "data": [250, 3, [112, 107]],
+        "animations": [8, 8, 1, 8, 8, 3, 7, 3, 3],
+        "sheet": "assets/images/mage/Sprites/mage1.png",
+        "sheet2": "assets/images/mage/Sprites/mage1.png",  # Alternate sprite sheet
+        "sound": "assets/audio/magic.wav",
+        "stats": {
+            "health": 80,
+            "speed": 6,
+            "special_cooldown": 4000,
+            "special_cast_time": 500,
+            "damage": {"attack1": 25, "attack2": 15, "special": 15},
+            "attack_range": 4,
+            "animation_speed": 60,
+            "special_type": "global_attack",
+            "block_stamina": 40,
+            "damage_frames": {"attack1": 6, "attack2": 4},
+            "reaction_time": (100, 400)  # Average reactions
+        }
+    },
+    "Ranger": {
+        "data": [162, 4, [72, 56]],
+        "animations": [10, 8, 1, 7, 7, 3, 7, 3, 3],
+        "sheet": "assets/images/ranger/Sprites/Ranger.png",
+        "sheet2": "assets/images/ranger/Sprites/Ranger.png",  # Alternate sprite sheet
+        "sound": "assets/audio/sword.wav",
+        "stats": {
+            "health": 100,
+            "speed": 10,
+            "special_cooldown": 3000,
+            "special_cast_time": 100,
+            "damage": {"attack1": 15, "attack2": 10, "special": 10},
+            "attack_range": 3,
+            "animation_speed": 50,
+            "special_type": "screen_dash",
+            "dash_speed": 25,
+            "dash_distance": int(SCREEN_WIDTH * 1.5),
+            "block_stamina": 60,
+            "damage_frames": {"attack1": 3, "attack2": 5},
+            "reaction_time": (100, 300)  # Slightly faster than average
+        }
+    },
+    "Warlock": {
+        "data": [250, 3, [112, 107]],
+        "animations": [8, 8, 1, 8, 8, 3, 7, 3, 3],
+        "sheet": "assets/images/warlock/Sprites/mage1.png",
+        "sheet2": "assets/images/warlock/Sprites/mage1.png",  # Alternate sprite sheet
+        "sound": "assets/audio/magic.wav",
+        "stats": {
+            "health": 90,
+            "speed": 6,
+            "special_cooldown": 3000,
+            "special_cast_time": 500,
+            "damage": {"attack1": 15, "attack2": 15, "special": 25},
+            "attack_range": 3,
+            "animation_speed": 55,
+            "special_type": "health_steal",
+            "steal_amount": 25,
+            "block_stamina": 45,
+            "damage_frames": {"attack1": 4, "attack2": 5},
+            "reaction_time": (150, 450)  # Slower reactions = blocks less
+        }
+    },
+    "Guardian": {
+        "data": [162, 4, [72, 56]],
+        "animations": [10, 8, 1, 7, 7, 3, 7, 3, 3],
+        "sheet": "assets/images/guardian/Sprites/warrior1.png",
+        "sheet2": "assets/images/guardian/Sprites/warrior1.png",  # Alternate sprite sheet
+        "sound": "assets/audio/sword.wav",
+        "stats": {
+            "health": 110,
+            "speed": 7,
+            "special_cooldown": 2500,
+            "special_cast_time": 0,
+            "damage": {"attack1": 10, "attack2": 10, "special": 0},
+            "attack_range": 1.5,
+            "animation_speed": 55,
+            "special_type": "pull_root",
+            "root_duration": 2000,
+            "pull_distance": 100,
+            "pull_speed": 15,
+            "block_stamina": 65,
+            "damage_frames": {"attack1": 5, "attack2": 3},
+            "reaction_time": (75, 200)  # Very fast reactions = blocks often
+        }
+    },
+    "Sage": {
+        "data": [250, 3, [112, 107]],
+        "animations": [8, 8, 1, 8, 8, 3, 7, 3, 3],
+        "sheet": "assets/images/sage/Sprites/mage1.png",
+        "sheet2": "assets/images/sage/Sprites/mage1.png",  # Alternate sprite sheet
+        "sound": "assets/audio/magic.wav",
+        "stats": {
+            "health": 85,
+            "speed": 9,
+            "special_cooldown": 10000,
+            "special_cast_time": 1000,
+            "damage": {"attack1": 10, "attack2": 5, "special": 0},
+            "attack_range": 1.5,
+            "animation_speed": 60,
+            "special_type": "curse_effect",
+            "block_stamina": 60,
+            "damage_frames": {"attack1": 5, "attack2": 4},
+            "reaction_time": (50, 150),
+            "curse_damage_multiplier": 2
+        }
+    }
+}
+CHARACTER_DESCRIPTIONS = {
+    "Knight": "Balanced fighter with stun special",
+    "Mage": "Ranged caster with screen-wide special attack",
+    "Ranger": "Fast fighter with a screen-crossing dash",
+    "Warlock": "Powerful mage with life drain special ability",
+    "Guardian": "Short-range fighter with pull-root capabilities",
+    "Sage": "Curse master with low damage but good burst state"
+}
+
+
+# ---------------------------------------------------------------------------------------------------------COMPILED STATS
+# CHARACTER_DATA stays the editable source. At import each character's stats are compiled into a
+# read-only slotted record: special types become small ints, and damage and damage frames become
+# tuples indexed directly by attack type (1, 2 or 8), so the rules never look up nested dicts.
+SPECIAL_NONE = 0
+SPECIAL_STUN = 1
+SPECIAL_GLOBAL_ATTACK = 2
+SPECIAL_DASH = 3
+SPECIAL_STEAL = 4
+SPECIAL_PULL = 5
+SPECIAL_CURSE = 6
+SPECIAL_TYPES = {
+    None: SPECIAL_NONE,
+    "global_stun": SPECIAL_STUN,
+    "global_attack": SPECIAL_GLOBAL_ATTACK,
+    "screen_dash": SPECIAL_DASH,
+    "health_steal": SPECIAL_STEAL,
+    "pull_root": SPECIAL_PULL,
+    "curse_effect": SPECIAL_CURSE,
+}
+ATTACK_KEYS = {1: "attack1", 2: "attack2", 8: "special"}
+
+
+def by_attack_type(values, default=0):
+    table = [default] * 9
+    for attack_type, key in ATTACK_KEYS.items():
+        table[attack_type] = values.get(key, default)
+    return tuple(table)
+
+
+class CharacterStats:
+    __slots__ = ("name", "health", "speed", "special_cooldown", "special_cast_time", "damage", "damage_frames",
+                 "attack_range", "animation_speed", "special_type", "block_stamina", "reaction_time",
+                 "steal_amount", "dash_speed", "dash_distance", "root_duration", "pull_speed", "pull_distance",
+                 "curse_damage_multiplier", "ai_policy")
+
+    def __init__(self, name, stats):
+        values = {
+            "name": name,
+            "health": stats["health"],
+            "speed": stats["speed"],
+            "special_cooldown": stats["special_cooldown"],
+            "special_cast_time": stats["special_cast_time"],
+            "damage": by_attack_type(stats["damage"]),
+            "damage_frames": by_attack_type(stats["damage_frames"]),
+            "attack_range": stats["attack_range"],
+            "animation_speed": stats["animation_speed"],
+            "special_type": SPECIAL_TYPES[stats.get("special_type")],
+            "block_stamina": stats["block_stamina"],
+            "reaction_time": tuple(stats.get("reaction_time", (200, 400))),
+            "steal_amount": stats.get("steal_amount", 0),
+            "dash_speed": stats.get("dash_speed", 0),
+            "dash_distance": stats.get("dash_distance", SCREEN_WIDTH),
+            "root_duration": stats.get("root_duration", 2000),
+            "pull_speed": stats.get("pull_speed", 15),
+            "pull_distance": stats.get("pull_distance", 0),
+            "curse_damage_multiplier": stats.get("curse_damage_multiplier", 1.0),
+            "ai_policy": POLICIES[stats.get("special_type")],
+        }
+        for field, value in values.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, field, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f"CharacterStats({self.name!r})"
+
+
+CHARACTER_STATS = {name: CharacterStats(name, char_data["stats"]) for name, char_data in CHARACTER_DATA.items()}
+
+
+# ----------------------------------------------------------------------------------------------------------------INPUTS
+# Human input reaches the rules as one bitmask per player per tick, so a fight can be replayed
+# (or fed from the network) without a keyboard
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_BLOCK = 8
+INPUT_ATTACK1 = 16
+INPUT_ATTACK2 = 32
+INPUT_SPECIAL = 64
+PLAYER_KEYS = [
+    {INPUT_LEFT: pygame.K_a, INPUT_RIGHT: pygame.K_d, INPUT_JUMP: pygame.K_w, INPUT_BLOCK: pygame.K_s,
+     INPUT_ATTACK1: pygame.K_r, INPUT_ATTACK2: pygame.K_t, INPUT_SPECIAL: pygame.K_y},
+    {INPUT_LEFT: pygame.K_LEFT, INPUT_RIGHT: pygame.K_RIGHT, INPUT_JUMP: pygame.K_UP, INPUT_BLOCK: pygame.K_DOWN,
+     INPUT_ATTACK1: pygame.K_KP1, INPUT_ATTACK2: pygame.K_KP2, INPUT_SPECIAL: pygame.K_KP3},
+]
+
+
+def read_inputs(keys, player):
+    mask = 0
+    for bit, key in PLAYER_KEYS[player - 1].items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+# ----------------------------------------------------------------------------------------------------------------CLOCKS
+# Anything with get_ticks() can drive a fight: pygame.time for the live game,
+# ManualClock when the caller owns time (the fixed-timestep fight loop, headless simulation)
+class ManualClock:
+    def __init__(self, fps=FPS):
+        self.fps = fps
+        self.frames = 0
+        self.ticks = 0
+
+    def get_ticks(self):
+        return self.ticks
+
+    def tick(self):
+        # Advancing by exactly one frame, without rounding drift
+        self.frames += 1
+        self.ticks = self.frames * 1000 // self.fps
+
+    def advance(self, ms):
+        self.ticks += ms
+
+
+# ------------------------------------------------------------------------------------------------------------FIGHT RNG
+# SplitMix64: the whole generator state is one 64-bit integer, so a fight snapshot can carry it in
+# eight bytes (saving and restoring a Mersenne Twister costs more than the rest of the fight state).
+# The rules only ever draw random() and randint().
+RNG_MASK = (1 << 64) - 1
+
+
+class FightRandom:
+    __slots__ = ("state",)
+
+    def __init__(self, seed=0):
+        self.state = seed & RNG_MASK
+
+    def next64(self):
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & RNG_MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & RNG_MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & RNG_MASK
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def randint(self, a, b):
+        return a + self.next64() % (b - a + 1)
+
+
+# ----------------------------------------------------------------------------------------------------------SPRITE CACHE
+# Sheets are decoded once per process and their scaled frames, plain and mirrored, are shared
+# by every fighter and rematch that uses them (a mirror match loads the sheet only once)
+SHEET_CACHE = {}
+ANIMATION_CACHE = {}
+SCALED_CACHE = {}  # (frame, scale) -> smaller copy, for the low-resolution render mode
+
+
+def load_sheet(path):
+    if path not in SHEET_CACHE:
+        SHEET_CACHE[path] = pygame.image.load(path).convert_alpha()
+    return SHEET_CACHE[path]
+
+
+def load_animations(path, size, scale, steps, flip=False):
+    key = (path, size, scale, flip)
+    if key not in ANIMATION_CACHE:
+        if flip:
+            frames = load_animations(path, size, scale, steps)
+            ANIMATION_CACHE[key] = [[pygame.transform.flip(frame, True, False) for frame in row]
+                                    for row in frames]
+        else:
+            sheet = load_sheet(path)
+            animations = []
+            for row, count in enumerate(steps):
+                frames = []
+                for col in range(count):
+                    frame = sheet.subsurface(col * size, row * size, size, size)
+                    frames.append(pygame.transform.scale(frame, (size * scale, size * scale)))
+                animations.append(frames)
+            ANIMATION_CACHE[key] = animations
+    return ANIMATION_CACHE[key]
+
+
+def scaled_frame(frame, scale):
+    # Made the first time the frame is drawn at that scale, not for a whole sheet at once
+    key = (frame, scale)
+    scaled = SCALED_CACHE.get(key)
+    if scaled is None:
+        width, height = frame.get_size()
+        scaled = SCALED_CACHE[key] = pygame.transform.scale(frame, (round(width * scale), round(height * scale)))
+    return scaled
+
+
+# ---------------------------------------------------------------------------------------------------------COMBAT EVENTS
+# The rules report every combat outcome on the fight's event bus, FightState.events. It is None
+# when nobody listens, which costs one attribute check per outcome and nothing per tick. An event
+# is a tuple (kind, fight time in ms, *fields), with the fields of EVENT_FIELDS and fighters as
+# player numbers (0 for nobody). A fight a netplay rollback or the lookahead AI re-simulates has
+# no bus: it would report the same outcomes twice.
+EVENT_DAMAGE = 1  # Health lost, to a hit, a block's overflow, a steal or a curse
+EVENT_BLOCK = 2  # Block stamina drained, and whether the block broke
+EVENT_STEAL = 3  # Health a stealer gained (none past 100); the target's loss is its own DAMAGE event
+EVENT_STATUS = 4  # A status effect started
+EVENT_SPECIAL = 5  # A special took effect
+EVENT_FIELDS = {
+    EVENT_DAMAGE: ("source", "target", "amount", "cause"),
+    EVENT_BLOCK: ("source", "target", "amount", "broken"),
+    EVENT_STEAL: ("source", "target", "amount"),
+    EVENT_STATUS: ("source", "target", "status", "duration"),
+    EVENT_SPECIAL: ("source", "special_type"),
+}
+CAUSE_CURSE = 9  # Damage causes: attack types 1, 2 and 8 (the special), then these
+CAUSE_BACKLASH = 10  # A curse's damage to its caster
+CAUSE_NAMES = {1: "attack1", 2: "attack2", 8: "special", CAUSE_CURSE: "curse", CAUSE_BACKLASH: "backlash"}
+
+
+class CombatEvents:
+    def __init__(self):
+        self.handlers = {kind: [] for kind in EVENT_FIELDS}
+
+    def subscribe(self, handler, kinds=None):
+        # handler(event) for every event of these kinds (all of them by default)
+        for kind in kinds or EVENT_FIELDS:
+            self.handlers[kind].append(handler)
+
+    def unsubscribe(self, handler):
+        for handlers in self.handlers.values():
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def emit(self, event):
+        for handler in self.handlers[event[0]]:
+            handler(event)
+
+
+# --------------------------------------------------------------------------------------------------------STATUS EFFECTS
+# Timed conditions: stun, root, block exhaustion and the Sage's curse. Each running effect has one
+# entry in a timer heap, so a tick only touches the effects that come due, however many are
+# running. Effects stack: a fighter stays stunned (rooted, exhausted) while any of its stuns has
+# time left, and every curse deals its own damage. A fighter's conditions are in its own heap and
+# wear off at the start of its move; curses are in the fight's heap and tick at the start of every
+# step, paused or not.
+STATUS_NONE = 0
+STATUS_STUN = 1
+STATUS_ROOT = 2
+STATUS_EXHAUST = 3
+STATUS_CURSE = 4
+STATUS_COUNTERS = {STATUS_STUN: "stunned", STATUS_ROOT: "rooted", STATUS_EXHAUST: "block_exhausted"}
+CURSE_DURATION = 8000
+CURSE_PERIOD = 1000  # Between damage ticks
+CURSE_MAX_TICKS = 8
+CURSE_DAMAGE = 15  # To the target every tick...
+CURSE_BACKLASH = 5  # ... and to the caster
+
+
+class StatusEffect:
+    __slots__ = ("kind", "holder", "source", "end", "due", "ticks", "active")
+
+    def __init__(self, kind, holder, source, end, due=None, ticks=0):
+        self.kind = kind
+        self.holder = holder  # The fighter it's on
+        self.source = source  # Who put it there, None if nobody
+        self.end = end
+        self.due = end if due is None else due  # When it next needs handling: its end, or a curse's next tick
+        self.ticks = ticks
+        self.active = False
+
+
+class StatusTimers:
+    # The running effects, and a heap of (due, order, effect) saying which comes up next. An effect
+    # that ends early or is rescheduled leaves its old entry behind, skipped when it comes up.
+    __slots__ = ("effects", "heap", "order")
+
+    def __init__(self):
+        self.effects = []  # In the order they started
+        self.heap = []
+        self.order = 0
+
+    def add(self, effect):
+        effect.active = True
+        self.effects.append(effect)
+        self.schedule(effect, effect.due)
+
+    def schedule(self, effect, due):
+        effect.due = due
+        self.order += 1
+        heapq.heappush(self.heap, (due, self.order, effect))
+
+    def remove(self, effect):
+        effect.active = False
+        self.effects.remove(effect)
+
+    def clear(self):
+        for effect in self.effects:
+            effect.active = False
+        self.effects.clear()
+        self.heap.clear()
+
+    def pop_due(self, now):
+        # The running effects due by now, soonest first
+        heap = self.heap
+        due = []
+        while heap and heap[0][0] <= now:
+            time, _, effect = heapq.heappop(heap)
+            if effect.active and effect.due == time:
+                due.append(effect)
+        return due
+
+
+# ---------------------------------------------------------------------------------------------------------FIGHTER CLASS
+class Fighter:
+    # Fixed attribute set: no per-instance __dict__, and faster attribute access in the rules
+    __slots__ = ("player", "is_ai", "fight", "clock", "size", "image_scale", "offset", "flip", "animation_steps",
+                 "animation_list", "flipped_list", "action", "frame_index", "image", "update_time", "animation_speed",
+                 "rect", "last_pos", "vel_y", "running", "jump_count", "speed", "attacking", "attack_type",
+                 "attack_cooldown", "attack_sound", "hit", "blocking", "attack_range", "attack_start_time",
+                 "damage_applied", "attack_target", "damage", "health", "alive", "attack_cancelled", "steal_amount",
+                 "block_stamina", "current_block_stamina", "block_exhausted", "block_exhaust_duration",
+                 "special_type", "dashing", "dash_speed", "dash_distance", "dash_direction", "has_dash_contact",
+                 "dash_start_x", "dash_distance_traveled", "stunned", "stun_duration", "root_duration", "rooted",
+                 "being_pulled", "pull_target_x", "pull_speed", "special_cooldown", "special_cast_time",
+                 "damage_frames", "special_last_used", "stats", "last_block_attempt", "reaction_time",
+                 "block_attempt_time", "attack_detected", "defensive_mode", "curse_damage_multiplier", "cursing",
+                 "statuses", "ai_policy", "view")
+
+    def __init__(self, player, x, y, flip, data, sprite_sheet, animation_steps, sound, stats, fight, is_ai=False):
+        self.player = player
+        self.is_ai = is_ai
+        self.fight = fight
+        self.clock = fight.clock
+        self.size = data[0]
+        self.image_scale = data[1]
+        self.offset = data[2]
+        self.flip = flip
+        self.animation_steps = animation_steps
+        # Headless fighters (no sprite sheet) only track frame indices, never surfaces
+        self.animation_list = self.load_images(sprite_sheet, animation_steps) if sprite_sheet else None
+        self.flipped_list = self.load_images(sprite_sheet, animation_steps, True) if sprite_sheet else None
+        self.action = 0
+        self.frame_index = 0
+        self.image = self.animation_list[self.action][self.frame_index] if self.animation_list else None
+        self.update_time = self.clock.get_ticks()
+        self.animation_speed = stats.animation_speed
+        self.rect = pygame.Rect(x, y, 80, 180)
+        self.last_pos = self.rect.topleft  # Position at the previous tick, for render interpolation
+        self.vel_y = 0
+        self.running = False
+        self.jump_count = 0
+        self.speed = stats.speed
+        self.attacking = False
+        self.attack_type = 0
+        self.attack_cooldown = 0
+        self.attack_sound = sound
+        self.hit = False
+        self.blocking = False
+        self.attack_range = stats.attack_range
+        self.attack_start_time = 0
+        self.damage_applied = False
+        self.attack_target = None
+        self.damage = stats.damage  # Indexed by attack type
+        self.health = stats.health
+        self.alive = True
+        self.attack_cancelled = False
+        self.steal_amount = stats.steal_amount
+        self.block_stamina = stats.block_stamina
+        self.current_block_stamina = self.block_stamina
+        self.block_exhausted = 0  # Running exhaustions (status effects), like stunned and rooted
+        self.block_exhaust_duration = 2000
+        self.special_type = stats.special_type
+        self.dashing = False
+        self.dash_speed = stats.dash_speed
+        self.dash_distance = stats.dash_distance
+        self.dash_direction = 1
+        self.has_dash_contact = False
+        self.dash_start_x = 0
+        self.dash_distance_traveled = 0
+        self.stunned = 0
+        self.stun_duration = 2000
+        self.root_duration = stats.root_duration
+        self.rooted = 0
+        self.being_pulled = False
+        self.pull_target_x = 0
+        self.pull_speed = stats.pull_speed
+        self.special_cooldown = stats.special_cooldown
+        self.special_cast_time = stats.special_cast_time
+        self.damage_frames = stats.damage_frames  # Indexed by attack type
+        self.special_last_used = 0
+        self.stats = stats
+        self.last_block_attempt = 0
+        self.reaction_time = stats.reaction_time
+        self.block_attempt_time = 0
+        self.attack_detected = False
+        self.defensive_mode = False
+        self.curse_damage_multiplier = stats.curse_damage_multiplier
+        self.cursing = 0  # Running curses this fighter cast
+        self.statuses = StatusTimers()
+        self.ai_policy = stats.ai_policy
+        self.view = Perception() if is_ai else None  # Refilled every tick the AI thinks
+
+    def clone(self, fight):
+        # Headless copy living in another FightState (lookahead search); FightState.clone points its
+        # attack target back at the copied opponent
+        copy = Fighter.__new__(Fighter)
+        for name, value in zip(Fighter.__slots__, FIGHTER_FIELDS(self)):
+            setattr(copy, name, value)
+        copy.fight = fight
+        copy.clock = fight.clock
+        copy.rect = self.rect.copy()
+        copy.animation_list = copy.flipped_list = copy.image = copy.attack_sound = None
+        copy.statuses = StatusTimers()
+        copy.view = Perception() if self.is_ai else None
+        return copy
+
+    def load_images(self, sheet, steps, flip=False):
+        return load_animations(sheet, self.size, self.image_scale, steps, flip)
+
+    def move(self, screen_width, screen_height, surface, target, round_over):
+        GRAVITY = 2
+        dx = dy = 0
+        self.running = False
+        self.blocking = False
+        stunned = self.stunned
+        heap = self.statuses.heap
+        if heap and heap[0][0] <= self.clock.get_ticks():
+            self.wear_off(self.clock.get_ticks())
+        if stunned:
+            return  # Including the tick the stun wears off
+        if self.being_pulled:
+            if abs(self.rect.centerx - self.pull_target_x) > self.pull_speed:
+                if self.rect.centerx < self.pull_target_x:
+                    self.rect.x += self.pull_speed
+                else:
+                    self.rect.x -= self.pull_speed
+                self.hit = True
+                return
+            else:
+                self.being_pulled = False
+                self.add_status(STATUS_ROOT, self.root_duration)
+                self.hit = True
+        if self.is_ai and not self.attacking and not self.hit and not round_over and not self.fight.game_paused:
+            view = self.view
+            view.update(self, target, screen_width, self.clock.get_ticks())
+            # Checking if the character should block based on reaction time
+            if (self.attack_detected and view.now >= self.block_attempt_time and
+                    not self.block_exhausted and self.current_block_stamina > 0):
+                self.blocking = True
+                self.attack_detected = False
+            dx = self.ai_policy.guard(self, target, view, dx)
+        if not self.attacking and self.alive and not round_over and not self.hit and not self.fight.game_paused:
+            if self.is_ai:
+                dx = self.ai_policy.act(self, target, self.view, dx)
+                # Player controls
+            else:
+                dx = self.apply_controls(self.fight.inputs[self.player - 1], target, dx)
+        if self.dashing and not self.hit and not self.fight.game_paused:
+            dx = self.dash_speed * self.dash_direction * 3
+            self.rect.x += dx
+            self.dash_distance_traveled += abs(dx)
+            # Checking for collision with the opponent during dash
+            if not self.has_dash_contact:
+                for contact in self.fight.targets_in(self, self.rect):
+                    self.has_dash_contact = True
+                    if not contact.blocking or contact.block_exhausted:
+                        contact.health -= self.damage[8]
+                        contact.hit = True
+                        if self.fight.events:
+                            self.fight.report(EVENT_DAMAGE, self.player, contact.player, self.damage[8], 8)
+                        if contact.stunned:
+                            contact.clear_status(STATUS_STUN)
+                    elif contact.blocking and not contact.block_exhausted:
+                        contact.current_block_stamina -= self.damage[8]
+                        if self.fight.events:
+                            self.fight.report(EVENT_BLOCK, self.player, contact.player, self.damage[8],
+                                              contact.current_block_stamina <= 0)
+                        if contact.current_block_stamina <= 0:
+                            contact.add_status(STATUS_EXHAUST, contact.block_exhaust_duration, self)
+                            contact.blocking = False
+            if self.dash_distance_traveled >= self.dash_distance:
+                self.dashing = False
+                self.has_dash_contact = False
+                self.dash_distance_traveled = 0
+        else:
+            self.vel_y += GRAVITY
+            dy += self.vel_y
+        if self.rect.right < 0:
+            self.rect.left = screen_width
+        elif self.rect.left > screen_width:
+            self.rect.right = 0
+        if self.rect.bottom + dy > screen_height - 110:
+            self.vel_y = 0
+            dy = screen_height - 110 - self.rect.bottom
+            self.jump_count = 0
+        direct_distance = abs(target.rect.centerx - self.rect.centerx)
+        wrapped_distance = screen_width - direct_distance
+        if direct_distance < wrapped_distance:
+            self.flip = target.rect.centerx < self.rect.centerx
+        else:
+            self.flip = target.rect.centerx > self.rect.centerx
+        if self.attack_cooldown > 0:
+            self.attack_cooldown -= 1
+        if not self.rooted and not self.being_pulled and not self.dashing:
+            self.rect.x += dx
+        self.rect.y += dy
+
+    def apply_controls(self, controls, target, dx):
+        # One tick of an input bitmask (a player's keys, a recorded replay or a policy that plays by keys)
+        if controls & INPUT_BLOCK and not self.block_exhausted:
+            self.blocking = True
+        elif controls & INPUT_SPECIAL:
+            self.initiate_attack(8, target)
+        else:
+            if not self.rooted:
+                if controls & INPUT_LEFT:
+                    dx = -self.speed
+                    self.running = True
+                if controls & INPUT_RIGHT:
+                    dx = self.speed
+                    self.running = True
+            if controls & INPUT_JUMP and self.jump_count < 1 and not self.rooted:
+                self.vel_y = -30
+                self.jump_count += 1
+            if controls & INPUT_ATTACK1:
+                self.initiate_attack(1, target)
+            elif controls & INPUT_ATTACK2:
+                self.initiate_attack(2, target)
+        return dx
+
+    def initiate_attack(self, attack_type, target):
+        if self.hit or self.fight.game_paused:
+            return
+        # Notifying target about an upcoming attack
+        if target.is_ai:
+            reaction_delay = self.fight.rng.randint(target.reaction_time[0], target.reaction_time[1])
+            target.block_attempt_time = self.clock.get_ticks() + reaction_delay
+            target.attack_detected = True
+        if attack_type == 8:
+            current_time = self.clock.get_ticks()
+            if current_time - self.special_last_used < self.special_cooldown:
+                return
+            self.attacking = True
+            self.attack_type = 8
+            if self.fight.sound_on and self.attack_sound:
+                self.attack_sound.play("special")
+            self.attack_start_time = current_time
+            self.damage_applied = False
+            self.attack_target = target
+            self.attack_cancelled = False
+            self.special_last_used = 0
+            if self.special_cast_time == 0:
+                self.apply_special_effect()
+        elif self.attack_cooldown == 0:
+            self.attacking = True
+            self.attack_type = attack_type
+            if self.fight.sound_on and self.attack_sound:
+                self.attack_sound.play("attack")
+            self.attack_start_time = self.clock.get_ticks()
+            self.damage_applied = False
+            self.attack_target = target
+            self.attack_cancelled = False
+            if self.damage_frames[attack_type] == 1:
+                self.apply_attack_damage()
+
+    def update(self):
+        if self.fight.game_paused:
+            return
+        current_time = self.clock.get_ticks()
+        if self.hit and self.attacking:
+            self.attacking = False
+            self.attack_cancelled = True
+            self.dashing = False
+            self.set_action(5)
+            return
+        if self.health <= 0:
+            self.health = 0
+            if self.alive:
+                self.alive = False
+                self.fight.fighter_down(self)
+            self.set_action(6)
+        elif self.hit:
+            self.set_action(5)
+            if self.stunned:
+                self.clear_status(STATUS_STUN)
+        elif self.dashing:
+            self.set_action(8)
+        elif self.attacking:
+            if self.attack_type == 1:
+                self.set_action(3)
+                if (self.frame_index + 1) == self.damage_frames[1] and not self.damage_applied:
+                    self.apply_attack_damage()
+            elif self.attack_type == 2:
+                self.set_action(4)
+                if (self.frame_index + 1) == self.damage_frames[2] and not self.damage_applied:
+                    self.apply_attack_damage()
+            elif self.attack_type == 8:
+                self.set_action(8)
+                if not self.damage_applied and not self.attack_cancelled:
+                    cast_progress = current_time - self.attack_start_time
+                    if cast_progress < self.special_cast_time:
+                        if self.frame_index >= self.animation_steps[self.action] - 1:
+                            self.frame_index = 0
+                    else:
+                        self.apply_special_effect()
+        elif self.blocking:
+            self.set_action(7)
+        elif self.jump_count > 0 and self.vel_y < 0:
+            self.set_action(2)
+        elif self.running:
+            self.set_action(1)
+        else:
+            self.set_action(0)
+        if not (self.attacking and self.attack_type == 8 and not self.damage_applied and
+                (current_time - self.attack_start_time) < self.special_cast_time):
+            if current_time - self.update_time > self.animation_speed:
+                self.frame_index += 1
+                self.update_time = current_time
+        if self.frame_index >= self.animation_steps[self.action]:
+            if not self.alive:
+                self.frame_index = self.animation_steps[self.action] - 1
+            else:
+                self.frame_index = 0
+                if self.action in (3, 4):
+                    if not self.damage_applied and not self.attack_cancelled:
+                        self.apply_attack_damage()
+                    self.attacking = False
+                    self.damage_applied = True
+                    self.attack_cooldown = 20
+                elif self.action == 8:
+                    if not self.damage_applied and not self.attack_cancelled:
+                        if (current_time - self.attack_start_time) >= self.special_cast_time:
+                            self.apply_special_effect()
+                    self.attacking = False
+                    self.damage_applied = True
+                elif self.action == 5:
+                    self.hit = False
+                    self.attack_cooldown = 20
+                elif self.action == 7:
+                    self.blocking = False
+        if self.animation_list:
+            self.image = self.animation_list[self.action][self.frame_index]
+
+    def apply_special_effect(self):
+        current_time = self.clock.get_ticks()
+        if self.attack_cancelled:
+            return
+        if self.special_type == SPECIAL_GLOBAL_ATTACK:
+            if self.attack_target:
+                if self.attack_target.blocking and not self.attack_target.block_exhausted:
+                    self.drain_block(self.attack_target, self.damage[8])
+                else:
+                    self.attack_target.health -= self.damage[8]
+                    self.attack_target.hit = True
+                    if self.fight.events:
+                        self.fight.report(EVENT_DAMAGE, self.player, self.attack_target.player, self.damage[8], 8)
+                self.special_used(current_time)
+        elif self.special_type == SPECIAL_STUN:
+            if self.attack_target and not self.attack_target.stunned:
+                self.attack_target.add_status(STATUS_STUN, self.attack_target.stun_duration, self)
+                if self.attack_target.attacking:
+                    self.attack_target.attack_cancelled = True
+                    self.attack_target.attacking = False
+                    self.attack_target.dashing = False
+                self.special_used(current_time)
+        elif self.special_type == SPECIAL_STEAL:
+            if self.attack_target:
+                attack_area = pygame.Rect(
+                    self.rect.centerx - (self.attack_range * self.rect.width * self.flip),
+                    self.rect.y,
+                    self.attack_range * self.rect.width,
+                    self.rect.height
+                )
+                if attack_area.colliderect(self.attack_target.rect):
+                    if self.attack_target.blocking and not self.attack_target.block_exhausted:
+                        remaining_damage = self.drain_block(self.attack_target, self.steal_amount)
+                        if remaining_damage is not None:
+                            self.steal_health(self.attack_target,
+                                              min(self.steal_amount, self.attack_target.health + remaining_damage))
+                    else:
+                        steal = min(self.steal_amount, self.attack_target.health)
+                        self.attack_target.health -= steal
+                        self.attack_target.hit = True
+                        if self.fight.events:
+                            self.fight.report(EVENT_DAMAGE, self.player, self.attack_target.player, steal, 8)
+                        self.steal_health(self.attack_target, steal)
+                self.special_used(current_time)
+        elif self.special_type == SPECIAL_CURSE:
+            if self.attack_target and not self.attack_cancelled:
+                self.fight.add_curse(self, self.attack_target)
+                self.special_used(current_time)
+        elif self.special_type == SPECIAL_DASH:
+            self.dashing = True
+            self.has_dash_contact = False
+            self.dash_direction = -1 if self.flip else 1
+            self.dash_start_x = self.rect.centerx
+            self.dash_distance_traveled = 0
+            self.special_used(current_time)
+        elif self.special_type == SPECIAL_PULL:
+            pull_direction = 1 if self.rect.centerx < self.attack_target.rect.centerx else -1
+            target_x = self.rect.centerx + (self.stats.pull_distance * pull_direction)
+            self.attack_target.being_pulled = True
+            self.attack_target.pull_target_x = target_x
+            self.attack_target.hit = True
+            if self.attack_target.attacking:
+                self.attack_target.attack_cancelled = True
+                self.attack_target.attacking = False
+                self.attack_target.dashing = False
+            self.special_used(current_time)
+
+    def special_used(self, current_time):
+        self.damage_applied = True
+        self.special_last_used = current_time
+        if self.fight.events:
+            self.fight.report(EVENT_SPECIAL, self.player, self.special_type)
+
+    def drain_block(self, target, amount):
+        # A blocked hit: drains up to amount of block stamina. Returns what went over the stamina when
+        # the block broke (the target loses that much health), None while it holds.
+        damage = min(amount, target.current_block_stamina)
+        target.current_block_stamina -= damage
+        if self.fight.events:
+            self.fight.report(EVENT_BLOCK, self.player, target.player, damage, target.current_block_stamina <= 0)
+        if target.current_block_stamina > 0:
+            return None
+        target.add_status(STATUS_EXHAUST, target.block_exhaust_duration, self)
+        target.blocking = False
+        remaining_damage = abs(target.current_block_stamina)
+        target.health -= remaining_damage
+        target.hit = True
+        if remaining_damage and self.fight.events:
+            self.fight.report(EVENT_DAMAGE, self.player, target.player, remaining_damage, self.attack_type)
+        return remaining_damage
+
+    def steal_health(self, target, steal):
+        before = self.health
+        self.health = min(100, self.health + steal)
+        if self.fight.events and self.health > before:
+            self.fight.report(EVENT_STEAL, self.player, target.player, self.health - before)
+
+    def apply_attack_damage(self):
+        if self.attack_type in (1, 2, 8) and not self.attack_cancelled:
+            attack_area = pygame.Rect(
+                self.rect.centerx - (self.attack_range * self.rect.width * self.flip),
+                self.rect.y,
+                self.attack_range * self.rect.width,
+                self.rect.height
+            )
+            # Calculate damage with potential multiplier (for Sage during curse)
+            damage_multiplier = self.curse_damage_multiplier if self.cursing else 1.0
+            for target in self.fight.targets_in(self, attack_area):
+                self.strike(target, damage_multiplier)
+        self.damage_applied = True
+
+    def strike(self, target, damage_multiplier):
+        if target.blocking and not target.block_exhausted:
+            remaining_damage = self.drain_block(target, int(self.damage[self.attack_type] * damage_multiplier))
+            if remaining_damage is not None and self.special_type == SPECIAL_STEAL and self.attack_type == 8:
+                self.steal_health(target, min(self.steal_amount, remaining_damage))
+        elif not target.blocking or target.block_exhausted:
+            if self.special_type == SPECIAL_STEAL and self.attack_type == 8:
+                steal = min(self.steal_amount, target.health)
+                target.health -= steal
+                target.hit = True
+                if self.fight.events:
+                    self.fight.report(EVENT_DAMAGE, self.player, target.player, steal, 8)
+                self.steal_health(target, steal)
+            else:
+                damage = int(self.damage[self.attack_type] * damage_multiplier)
+                target.health -= damage
+                target.hit = True
+                if self.fight.events:
+                    self.fight.report(EVENT_DAMAGE, self.player, target.player, damage, self.attack_type)
+        if target.stunned:
+            target.clear_status(STATUS_STUN)
+
+    def add_status(self, kind, duration, source=None):
+        self.start_status(StatusEffect(kind, self, source, self.clock.get_ticks() + duration))
+        if self.fight.events:
+            self.fight.report(EVENT_STATUS, source.player if source else 0, self.player, kind, duration)
+
+    def start_status(self, effect):
+        self.statuses.add(effect)
+        counter = STATUS_COUNTERS[effect.kind]
+        setattr(self, counter, getattr(self, counter) + 1)
+
+    def end_status(self, effect):
+        self.statuses.remove(effect)
+        counter = STATUS_COUNTERS[effect.kind]
+        setattr(self, counter, getattr(self, counter) - 1)
+        if effect.kind == STATUS_EXHAUST and not self.block_exhausted:
+            self.current_block_stamina = self.block_stamina
+
+    def clear_status(self, kind):
+        # Ends every running effect of this kind early (a hit knocks a fighter out of its stuns)
+        for effect in [effect for effect in self.statuses.effects if effect.kind == kind]:
+            self.end_status(effect)
+
+    def wear_off(self, now):
+        for effect in self.statuses.pop_due(now):
+            self.end_status(effect)
+
+    def status_left(self, kind, now):
+        # Milliseconds until the last running effect of this kind wears off
+        return max((effect.end - now for effect in self.statuses.effects if effect.kind == kind), default=0)
+
+    def set_action(self, new_action):
+        if new_action != self.action:
+            self.action = new_action
+            self.frame_index = 0
+            self.update_time = self.clock.get_ticks()
+
+    def draw(self, surface, alpha=1.0, scale=1):
+        # alpha blends between the previous and the current tick when rendering faster than the simulation;
+        # scale < 1 draws onto a smaller surface than the screen
+        x, y = self.rect.topleft
+        last_x, last_y = self.last_pos
+        if abs(x - last_x) < SCREEN_WIDTH // 2:  # No blending across the screen wrap-around
+            x = round(last_x + (x - last_x) * alpha)
+            y = round(last_y + (y - last_y) * alpha)
+        frames = self.flipped_list if self.flip else self.animation_list
+        image = frames[self.action][self.frame_index]
+        x -= self.offset[0] * self.image_scale
+        y -= self.offset[1] * self.image_scale
+        if scale != 1:
+            image = scaled_frame(image, scale)
+            x, y = round(x * scale), round(y * scale)
+        surface.blit(image, (x, y))
+
+
+FIGHTER_FIELDS = operator.attrgetter(*Fighter.__slots__)
+
+
+# -------------------------------------------------------------------------------------------------------FIGHT SNAPSHOTS
+# Everything that changes during a fight, packed into one fixed-layout struct: the fight's own
+# fields, then the same block for each fighter, then up to STATUS_SLOTS running status effects.
+# What comes from the character stats isn't stored, so a snapshot only restores into a fight
+# between the same two characters. Fighter references (attack target, effect holder and source)
+# are stored as player numbers, 0 for none. The effect counters (stunned, rooted, block_exhausted,
+# cursing) aren't stored either: restoring the effects rebuilds them.
+CHARACTER_NAMES = tuple(CHARACTER_DATA)
+FIGHT_STATE = (
+    ("intro_count", "b"), ("last_count_update", "i"), ("round_over", "?"), ("round_over_time", "i"),
+    ("game_paused", "?"),
+)
+FIGHTER_STATE = (
+    ("flip", "?"), ("action", "b"), ("frame_index", "b"), ("update_time", "i"), ("vel_y", "i"), ("running", "?"),
+    ("jump_count", "b"), ("attacking", "?"), ("attack_type", "b"), ("attack_cooldown", "i"), ("hit", "?"),
+    ("blocking", "?"), ("attack_start_time", "i"), ("damage_applied", "?"), ("health", "i"), ("alive", "?"),
+    ("attack_cancelled", "?"), ("current_block_stamina", "i"), ("dashing", "?"), ("dash_direction", "b"),
+    ("has_dash_contact", "?"), ("dash_start_x", "i"), ("dash_distance_traveled", "i"), ("being_pulled", "?"),
+    ("pull_target_x", "i"),
+    ("special_last_used", "i"), ("last_block_attempt", "i"), ("block_attempt_time", "i"), ("attack_detected", "?"),
+    ("defensive_mode", "?"),
+)
+FIGHT_FIELDS = tuple(name for name, _ in FIGHT_STATE)
+FIGHTER_STATE_FIELDS = tuple(name for name, _ in FIGHTER_STATE)
+GET_FIGHT_STATE = operator.attrgetter(*FIGHT_FIELDS)
+GET_FIGHTER_STATE = operator.attrgetter(*FIGHTER_STATE_FIELDS)
+# Fight: both characters, RNG, clock ticks and frames, both inputs.
+# Fighter: rect and last position, attack target.
+# Status effect: kind, holder, source, end, due, ticks; kind STATUS_NONE for an empty slot.
+FIGHTER_FORMAT = "".join(code for _, code in FIGHTER_STATE) + "iiiib"
+STATUS_SLOTS = 8  # A duel runs a handful at most: one stun and exhaustion per fighter, a curse per Sage
+STATUS_FORMAT = "bbbiib"
+SNAPSHOT = struct.Struct("<BBQiiBB" + "".join(code for _, code in FIGHT_STATE) + FIGHTER_FORMAT * 2 +
+                         STATUS_FORMAT * STATUS_SLOTS)
+SNAPSHOT_SIZE = SNAPSHOT.size
+FIGHT_VALUES = 7 + len(FIGHT_STATE)
+FIGHTER_VALUES = len(FIGHTER_STATE) + 5
+STATUS_VALUES = len(STATUS_FORMAT) * STATUS_SLOTS
+NO_STATUSES = (STATUS_NONE, 0, 0, 0, 0, 0) * STATUS_SLOTS
+
+
+# ---------------------------------------------------------------------------------------------------------FIGHT STATE
+class FightState:
+    def __init__(self, clock=pygame.time, seed=None, sound_on=True):
+        self.clock = clock
+        # Every fight gets a known seed so it can be replayed
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = FightRandom(self.seed)
+        self.inputs = [0, 0]  # Player 1 and player 2 input bitmasks for the next tick
+        self.sound_on = sound_on
+        self.fighter_1 = None
+        self.fighter_2 = None
+        self.intro_count = 3
+        self.last_count_update = clock.get_ticks()
+        self.round_over = False
+        self.round_over_time = 0
+        self.game_paused = False
+        self.profiler = None  # Optional FrameProfiler timing the rule phases of step()
+        self.events = None  # Optional CombatEvents bus the rules report outcomes on
+        self.statuses = StatusTimers()  # Running curses; each fighter keeps its own conditions
+
+    def clone(self, rng=None):
+        # Headless copy to simulate ahead from: its own clock, no sound or profiler. The RNG state is
+        # copied unless the caller passes a generator to use instead.
+        copy = FightState.__new__(FightState)
+        copy.__dict__.update(self.__dict__)
+        copy.clock = ManualClock(getattr(self.clock, "fps", FPS))
+        copy.clock.ticks = self.clock.get_ticks()
+        copy.clock.frames = getattr(self.clock, "frames", copy.clock.ticks * copy.clock.fps // 1000)
+        copy.rng = rng if rng is not None else FightRandom(self.rng.state)
+        copy.inputs = list(self.inputs)
+        copy.sound_on = False
+        copy.profiler = None
+        copy.events = None
+        copies = {}
+        for fighter in (self.fighter_1, self.fighter_2):
+            copies[fighter] = fighter.clone(copy)
+        copy.fighter_1, copy.fighter_2 = copies[self.fighter_1], copies[self.fighter_2]
+        for fighter in copies.values():
+            fighter.attack_target = copies.get(fighter.attack_target)
+        copy.statuses = StatusTimers()
+        numbers = {None: 0, self.fighter_1: 1, self.fighter_2: 2}
+        copy.load_statuses(self.status_values(numbers), (None, copy.fighter_1, copy.fighter_2))
+        return copy
+
+    def snapshot(self, buffer=None, offset=0):
+        # Packs the fight into buffer at offset (a new bytearray if none) and returns the buffer.
+        # Cheap enough to call every tick; a ring of snapshots can share one preallocated buffer.
+        if buffer is None:
+            buffer = bytearray(SNAPSHOT_SIZE)
+        fighter_1, fighter_2 = self.fighter_1, self.fighter_2
+        numbers = {None: 0, fighter_1: 1, fighter_2: 2}
+        clock = self.clock
+        ticks = clock.get_ticks()
+        rect_1, rect_2 = fighter_1.rect, fighter_2.rect
+        SNAPSHOT.pack_into(
+            buffer, offset,
+            CHARACTER_NAMES.index(fighter_1.stats.name), CHARACTER_NAMES.index(fighter_2.stats.name),
+            self.rng.state, ticks, getattr(clock, "frames", 0), self.inputs[0], self.inputs[1], *GET_FIGHT_STATE(self),
+            *GET_FIGHTER_STATE(fighter_1), rect_1.x, rect_1.y, *fighter_1.last_pos, numbers[fighter_1.attack_target],
+            *GET_FIGHTER_STATE(fighter_2), rect_2.x, rect_2.y, *fighter_2.last_pos, numbers[fighter_2.attack_target],
+            *self.status_values(numbers),
+        )
+        return buffer
+
+    def restore(self, buffer, offset=0, rng=True):
+        # Puts the fight back to a snapshot. rng=False keeps the current generator state, so
+        # repeated simulations from one snapshot can play out differently.
+        values = SNAPSHOT.unpack_from(buffer, offset)
+        fighter_1, fighter_2 = self.fighter_1, self.fighter_2
+        if (CHARACTER_NAMES[values[0]], CHARACTER_NAMES[values[1]]) != (fighter_1.stats.name, fighter_2.stats.name):
+            raise ValueError("snapshot is of a different matchup")
+        fighters = (None, fighter_1, fighter_2)
+        if rng:
+            self.rng.state = values[2]
+        if isinstance(self.clock, ManualClock):
+            self.clock.ticks, self.clock.frames = values[3], values[4]
+        self.inputs[0], self.inputs[1] = values[5], values[6]
+        for name, value in zip(FIGHT_FIELDS, values[7:FIGHT_VALUES]):
+            setattr(self, name, value)
+        start = FIGHT_VALUES
+        for fighter in (fighter_1, fighter_2):
+            end = start + FIGHTER_VALUES
+            for name, value in zip(FIGHTER_STATE_FIELDS, values[start:end]):
+                setattr(fighter, name, value)
+            x, y, last_x, last_y, target = values[end - 5:end]
+            fighter.rect.topleft = (x, y)
+            fighter.last_pos = (last_x, last_y)
+            fighter.attack_target = fighters[target]
+            if fighter.animation_list:
+                fighter.image = fighter.animation_list[fighter.action][fighter.frame_index]
+            start = end
+        self.load_statuses(values[start:], fighters)
+
+    def status_values(self, numbers):
+        # The running effects as snapshot slots: the curses, then each fighter's own
+        values = []
+        for timers in (self.statuses, self.fighter_1.statuses, self.fighter_2.statuses):
+            for effect in timers.effects:
+                values += (effect.kind, numbers[effect.holder], numbers[effect.source], effect.end, effect.due,
+                           effect.ticks)
+        if len(values) > STATUS_VALUES:
+            raise ValueError(f"more than {STATUS_SLOTS} status effects to snapshot")
+        values += NO_STATUSES[len(values):]
+        return values
+
+    def load_statuses(self, values, fighters):
+        # Replaces every running effect with the snapshot slots; fighters maps player numbers to fighters
+        self.statuses.clear()
+        for fighter in fighters[1:]:
+            fighter.statuses.clear()
+            fighter.stunned = fighter.rooted = fighter.block_exhausted = fighter.cursing = 0
+        for i in range(0, STATUS_VALUES, len(STATUS_FORMAT)):
+            kind, holder, source, end, due, ticks = values[i:i + len(STATUS_FORMAT)]
+            if kind == STATUS_NONE:
+                break
+            effect = StatusEffect(kind, fighters[holder], fighters[source], end, due, ticks)
+            if kind == STATUS_CURSE:
+                self.start_curse(effect)
+            else:
+                effect.holder.start_status(effect)
+
+    def targets_in(self, fighter, area):
+        # Who an attack area (or a dashing fighter's rect) hits: in a duel, only the fighter's target
+        target = fighter.attack_target
+        return (target,) if target and area.colliderect(target.rect) else ()
+
+    def add_curse(self, caster, target):
+        now = self.clock.get_ticks()
+        curse = StatusEffect(STATUS_CURSE, target, caster, now + CURSE_DURATION, now + CURSE_PERIOD)
+        if not (caster.alive and target.alive):
+            curse.end = curse.due = now
+        self.start_curse(curse)
+        if self.events:
+            self.report(EVENT_STATUS, caster.player, target.player, STATUS_CURSE, curse.end - now)
+
+    def start_curse(self, curse):
+        self.statuses.add(curse)
+        curse.source.cursing += 1
+
+    def end_curse(self, curse):
+        self.statuses.remove(curse)
+        curse.source.cursing -= 1
+
+    def fighter_down(self, fighter):
+        # Curses cast by or on a fighter that went down end at the start of the next tick
+        now = self.clock.get_ticks()
+        for curse in self.statuses.effects:
+            if (curse.holder is fighter or curse.source is fighter) and curse.end > now:
+                curse.end = now
+                self.statuses.schedule(curse, now)
+
+    def report(self, kind, *fields):
+        # Call only when events is set
+        self.events.emit((kind, self.clock.get_ticks()) + fields)
+
+    def handle_status_effects(self):
+        # Only the curses that are due: a damage tick, or the end
+        now = self.clock.get_ticks()
+        for curse in self.statuses.pop_due(now):
+            if now >= curse.end:
+                self.end_curse(curse)
+                continue
+            target, caster = curse.holder, curse.source
+            if target.alive:
+                target.health -= CURSE_DAMAGE
+                if self.events:
+                    self.report(EVENT_DAMAGE, caster.player, target.player, CURSE_DAMAGE, CAUSE_CURSE)
+            if caster.alive:
+                caster.health -= CURSE_BACKLASH
+                if self.events:
+                    self.report(EVENT_DAMAGE, caster.player, caster.player, CURSE_BACKLASH, CAUSE_BACKLASH)
+            curse.ticks += 1
+            due = min(now + CURSE_PERIOD, curse.end) if curse.ticks < CURSE_MAX_TICKS else curse.end
+            self.statuses.schedule(curse, due)
+
+    def curse_visible(self):
+        return bool(self.statuses.effects)
+
+    def step(self, surface=None):
+        # One tick of combat rules; returns the winner on the tick the round ends
+        self.fighter_1.last_pos = self.fighter_1.rect.topleft
+        self.fighter_2.last_pos = self.fighter_2.rect.topleft
+        self.handle_status_effects()
+        if self.profiler:
+            self.profiler.mark("status_effects")
+        if self.intro_count > 0:
+            if self.clock.get_ticks() - self.last_count_update >= 1000 and not self.game_paused:
+                self.intro_count -= 1
+                self.last_count_update = self.clock.get_ticks()
+        elif not self.game_paused:
+            self.fighter_1.move(SCREEN_WIDTH, SCREEN_HEIGHT, surface, self.fighter_2, self.round_over)
+            self.fighter_2.move(SCREEN_WIDTH, SCREEN_HEIGHT, surface, self.fighter_1, self.round_over)
+        if self.profiler:
+            self.profiler.mark("move")
+        self.fighter_1.update()
+        self.fighter_2.update()
+        if self.profiler:
+            self.profiler.mark("update")
+        winner = None
+        if not self.round_over and not self.game_paused:
+            if not self.fighter_1.alive:
+                winner = "Player 2"
+            elif not self.fighter_2.alive:
+                winner = "Player 1"
+            if winner:
+                self.round_over = True
+                self.round_over_time = self.clock.get_ticks()
+        return winner
+
+
+def build_fighter(fight, player_num, char_name, x_pos, flip, is_ai=False, sheet=None, sound=None):
+    # Without a sheet/sound the fighter runs headless: same rules, no surfaces or mixer
+    char_data = CHARACTER_DATA[char_name]
+    return Fighter(
+        player_num, x_pos, 310, flip,
+        char_data["data"], sheet, char_data["animations"], sound,
+        CHARACTER_STATS[char_name], fight, is_ai
+    )
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------------------------------------------------------MATCH HISTORY
+# Every match ever played, one row each. Appending is a single indexed insert whatever the size of
+# the table, and lookups by character, mode or winner go through an index instead of a scan.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    date REAL,
+    fighter1 TEXT NOT NULL,
+    fighter2 TEXT NOT NULL,
+    game_mode TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    premature INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS matches_fighter1 ON matches (fighter1, id);
+CREATE INDEX IF NOT EXISTS matches_fighter2 ON matches (fighter2, id);
+CREATE INDEX IF NOT EXISTS matches_mode ON matches (game_mode, id);
+CREATE INDEX IF NOT EXISTS matches_winner ON matches (winner, id);
+"""
+INSERT = "INSERT INTO matches (date, fighter1, fighter2, game_mode, winner, premature) VALUES (?, ?, ?, ?, ?, ?)"
+COLUMNS = ("id", "date", "fighter1", "fighter2", "game_mode", "winner", "premature")
+
+
+class HistoryStore:
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()  # Inserts may come from the persistence worker
+        self.recent_cache = {}
+        self.stale_recent = {}
+        if legacy_path and os.path.exists(legacy_path) and self.count() == 0:
+            self.import_json(legacy_path)
+
+    def import_json(self, path):
+        # The old SMFG_history.json only kept 10 matches and its "date" was pygame ticks, not a time
+        try:
+            with open(path, 'r') as f:
+                matches = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.db.executemany(INSERT, [(None, m["fighter1"], m["fighter2"], m["game_mode"], m["winner"],
+                                      int(m.get("premature", False))) for m in matches])
+        self.db.commit()
+
+    def add(self, fighter1, fighter2, game_mode, winner, premature=False, date=None):
+        if date is None:
+            date = time.time()
+        with self.lock:
+            cursor = self.db.execute(INSERT, (date, fighter1, fighter2, game_mode, winner, int(premature)))
+            self.db.commit()
+            self.recent_cache.clear()
+            return cursor.lastrowid
+
+    def where(self, column=None, character=None, game_mode=None, winner=None):
+        clauses, params = [], []
+        if column is not None:
+            clauses.append(f"{column} = ?")
+            params.append(character)
+        if game_mode is not None:
+            clauses.append("game_mode = ?")
+            params.append(game_mode)
+        if winner is not None:
+            clauses.append("winner = ?")
+            params.append(winner)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, character=None, game_mode=None, winner=None, limit=-1):
+        # Newest first. A character can be on either side, so each side walks its own (fighter, id)
+        # index backwards and the two halves are merged; an OR would sort every match they played.
+        columns = ", ".join(COLUMNS)
+        if character is None:
+            where, params = self.where(None, None, game_mode, winner)
+            sql = f"SELECT {columns} FROM matches{where} ORDER BY id DESC LIMIT ?"
+        else:
+            where_1, params_1 = self.where("fighter1", character, game_mode, winner)
+            where_2, params_2 = self.where("fighter2", character, game_mode, winner)
+            sql = (f"SELECT * FROM (SELECT {columns} FROM matches{where_1} ORDER BY id DESC LIMIT ?) UNION "
+                   f"SELECT * FROM (SELECT {columns} FROM matches{where_2} ORDER BY id DESC LIMIT ?) "
+                   f"ORDER BY id DESC LIMIT ?")
+            params = params_1 + [limit] + params_2 + [limit]
+        with self.lock:
+            return [dict(zip(COLUMNS, row)) for row in self.db.execute(sql, params + [limit])]
+
+    def count(self, character=None, game_mode=None, winner=None):
+        where, params = self.where(None, None, game_mode, winner)
+        if character is not None:
+            where += (" AND" if where else " WHERE") + " (fighter1 = ? OR fighter2 = ?)"
+            params += [character, character]
+        with self.lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM matches{where}", params).fetchone()[0]
+
+    def recent(self, limit=10):
+        # The history screen asks every frame; the answer only changes when a match is added. While an
+        # insert holds the database the previous answer is returned rather than waiting for the disk.
+        if limit not in self.recent_cache:
+            if not self.lock.acquire(blocking=False):
+                return self.stale_recent.get(limit, [])
+            try:
+                rows = self.db.execute(f"SELECT {', '.join(COLUMNS)} FROM matches ORDER BY id DESC LIMIT ?", (limit,))
+                self.recent_cache[limit] = self.stale_recent[limit] = [dict(zip(COLUMNS, row)) for row in rows]
+            finally:
+                self.lock.release()
+        return self.stale_recent[limit]
+
+    def compact(self, keep=None):
+        # Optionally drops all but the newest keep matches, then rebuilds the file without free pages
+        with self.lock:
+            if keep is not None:
+                self.db.execute("DELETE FROM matches WHERE id <= (SELECT id FROM matches ORDER BY id DESC "
+                                "LIMIT 1 OFFSET ?)", (keep,))
+                self.db.commit()
+                self.recent_cache.clear()
+            self.db.execute("VACUUM")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or compact the match history")
+    parser.add_argument("--db", default="SMFG_history.db")
+    parser.add_argument("--character")
+    parser.add_argument("--mode", choices=["PVP", "PVE"])
+    parser.add_argument("--winner")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--compact", action="store_true", help="rebuild the file, dropping deleted pages")
+    parser.add_argument("--keep", type=int, help="with --compact, keep only the newest KEEP matches")
+    args = parser.parse_args()
+    store = HistoryStore(args.db)
+    if args.compact:
+        store.compact(args.keep)
+    print(f"{store.count(args.character, args.mode, args.winner)} matching matches")
+    for match in store.query(args.character, args.mode, args.winner, args.limit):
+        date = time.strftime("%Y-%m-%d %H:%M", time.localtime(match["date"])) if match["date"] else "-"
+        print(f"{date:<17}{match['fighter1']:>9} vs {match['fighter2']:<9}{match['game_mode']:<5}{match['winner']}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
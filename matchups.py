@@ -0,0 +1,151 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import CHARACTER_DATA
+from simulate import run_match
+
+# ------------------------------------------------------------------------------------------------------MATCHUP MATRIX
+# Every ordered pair of CHARACTER_DATA entries plays the same number of headless AI-vs-AI matches.
+# Each cell has its own seed, so any single cell can be replayed with --cell
+CHUNK_SIZE = 50  # Matches per pool task, small enough to keep every core busy until the end
+
+
+def matchup_seed(base_seed, char_1, char_2):
+    names = list(CHARACTER_DATA)
+    return base_seed * 10000 + names.index(char_1) * 100 + names.index(char_2)
+
+
+def match_seeds(cell_seed, matches):
+    rng = random.Random(cell_seed)
+    return [rng.randrange(2 ** 32) for _ in range(matches)]
+
+
+def play_chunk(task):
+    char_1, char_2, seeds = task
+    totals = {"wins1": 0, "wins2": 0, "draws": 0, "duration": 0, "health1": 0, "health2": 0}
+    for seed in seeds:
+        result = run_match(char_1, char_2, seed=seed)
+        if result["winner"] == "Player 1":
+            totals["wins1"] += 1
+        elif result["winner"] == "Player 2":
+            totals["wins2"] += 1
+        else:
+            totals["draws"] += 1
+        totals["duration"] += result["duration"]
+        totals["health1"] += result["health1"]
+        totals["health2"] += result["health2"]
+    return char_1, char_2, totals
+
+
+def run_matrix(matches, base_seed=0, workers=None, pairs=None):
+    if pairs is None:
+        pairs = [(a, b) for a in CHARACTER_DATA for b in CHARACTER_DATA]
+    cells = {}
+    tasks = []
+    for char_1, char_2 in pairs:
+        cell_seed = matchup_seed(base_seed, char_1, char_2)
+        cells[(char_1, char_2)] = {
+            "fighter1": char_1, "fighter2": char_2, "seed": cell_seed, "matches": matches,
+            "wins1": 0, "wins2": 0, "draws": 0, "duration": 0, "health1": 0, "health2": 0
+        }
+        seeds = match_seeds(cell_seed, matches)
+        for i in range(0, matches, CHUNK_SIZE):
+            tasks.append((char_1, char_2, seeds[i:i + CHUNK_SIZE]))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for char_1, char_2, totals in pool.map(play_chunk, tasks):
+            cell = cells[(char_1, char_2)]
+            for key, value in totals.items():
+                cell[key] += value
+    rows = []
+    for cell in cells.values():
+        n = cell["matches"] or 1
+        rows.append({
+            "fighter1": cell["fighter1"],
+            "fighter2": cell["fighter2"],
+            "seed": cell["seed"],
+            "matches": cell["matches"],
+            "wins1": cell["wins1"],
+            "wins2": cell["wins2"],
+            "draws": cell["draws"],
+            "win_rate": round(cell["wins1"] / n, 4),
+            "avg_duration_ms": round(cell["duration"] / n, 1),
+            "avg_health1": round(cell["health1"] / n, 2),
+            "avg_health2": round(cell["health2"] / n, 2),
+        })
+    return rows
+
+
+def to_matrix(rows, key):
+    names = list(CHARACTER_DATA)
+    matrix = {a: {b: None for b in names} for a in names}
+    for row in rows:
+        matrix[row["fighter1"]][row["fighter2"]] = row[key]
+    return matrix
+
+
+def save_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_json(rows, path, base_seed):
+    with open(path, 'w') as f:
+        json.dump({
+            "base_seed": base_seed,
+            "characters": list(CHARACTER_DATA),
+            "win_rate": to_matrix(rows, "win_rate"),
+            "avg_duration_ms": to_matrix(rows, "avg_duration_ms"),
+            "avg_health1": to_matrix(rows, "avg_health1"),
+            "avg_health2": to_matrix(rows, "avg_health2"),
+            "cells": rows
+        }, f, indent=2)
+
+
+def print_win_rates(rows):
+    names = list(CHARACTER_DATA)
+    matrix = to_matrix(rows, "win_rate")
+    print("Win rate (row vs column)")
+    print(" " * 10 + "".join(name[:8].rjust(9) for name in names))
+    for a in names:
+        cells = ("-" if matrix[a][b] is None else f"{matrix[a][b]:.2f}" for b in names)
+        print(a[:10].ljust(10) + "".join(cell.rjust(9) for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin AI-vs-AI matchup matrix")
+    parser.add_argument("--matches", type=int, default=1000, help="matches per ordered pair")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; each cell derives its own")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: every core)")
+    parser.add_argument("--cell", nargs=2, metavar=("FIGHTER1", "FIGHTER2"),
+                        help="replay a single cell of the matrix")
+    parser.add_argument("--out", help="output path prefix for .csv and .json "
+                                      "(default: matchups, or matchups_<F1>_<F2> with --cell)")
+    args = parser.parse_args()
+
+    pairs = None
+    if args.cell:
+        for name in args.cell:
+            if name not in CHARACTER_DATA:
+                parser.error(f"unknown fighter {name}")
+        pairs = [tuple(args.cell)]
+    # A replayed cell gets files of its own rather than overwriting the full matrix
+    out = args.out or ("matchups_" + "_".join(args.cell) if args.cell else "matchups")
+    start = time.perf_counter()
+    rows = run_matrix(args.matches, args.seed, args.workers, pairs)
+    elapsed = time.perf_counter() - start
+    save_csv(rows, out + ".csv")
+    save_json(rows, out + ".json", args.seed)
+    print_win_rates(rows)
+    print(f"{len(rows) * args.matches} matches in {elapsed:.1f}s -> {out}.csv, {out}.json")
+
+
+if __name__ == "__main__":
+    main()
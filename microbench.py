@@ -0,0 +1,281 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from engine import (SCREEN_WIDTH, SCREEN_HEIGHT, CHARACTER_DATA, CHARACTER_STATS, SPECIAL_TYPES, SHEET_CACHE,
+                    ANIMATION_CACHE, STATUS_STUN, FightState, ManualClock, build_fighter)
+from history import HistoryStore
+from pacing import LEVEL_FULL, LEVEL_LOW_RES
+from startup import GAME_DIR, game_environment
+
+# -------------------------------------------------------------------------------------------------------MICROBENCHMARKS
+# Per-call timings of the fighter rules and of main.py's drawing helpers, under the dummy SDL
+# drivers. Most cases replay states recorded from a seeded AI-vs-AI fight with sprites: each sample
+# restores one state (untimed) and times a single call, so every branch the fight went through is
+# in the numbers. Cases named by special type use the one character that has it. The helpers in
+# main.py are timed inside the game itself (python main.py --microbench N). Results are saved as
+# JSON baselines; --compare flags every case whose median got slower than the threshold.
+BASELINE_VERSION = 1
+SEED = 7
+RECORD_TICKS = 1800
+RECORD_EVERY = 3
+DEFAULT_SAMPLES = 2000
+LOAD_SAMPLES = 10  # Cold sprite sheet loads are milliseconds each
+ROUNDS = 5
+DEFAULT_THRESHOLD = 10  # Percent slower before a case counts as a regression
+NOISE_US = 1.0  # ... and never for less than this
+SPECIAL_NAMES = {code: name or "none" for name, code in SPECIAL_TYPES.items()}
+
+
+def opponent(name):
+    return "Mage" if name == "Knight" else "Knight"
+
+
+def record_fight(names, seed=SEED):
+    # A seeded AI-vs-AI fight with sprites, and a snapshot every RECORD_EVERY ticks until the round ends
+    fight = FightState(clock=ManualClock(), seed=seed, sound_on=False)
+    sheet_2 = "sheet2" if names[0] == names[1] else "sheet"
+    fight.fighter_1 = build_fighter(fight, 1, names[0], 300, False, True, CHARACTER_DATA[names[0]]["sheet"])
+    fight.fighter_2 = build_fighter(fight, 2, names[1], 600, True, True, CHARACTER_DATA[names[1]][sheet_2])
+    fight.intro_count = 0
+    states = []
+    while fight.clock.frames < RECORD_TICKS and not fight.round_over:
+        fight.clock.tick()
+        fight.step()
+        if fight.clock.frames % RECORD_EVERY == 0:
+            states.append(fight.snapshot())
+    return fight, states
+
+
+def time_calls(samples, prepare, call, rounds=ROUNDS):
+    # The samples are split into rounds and the best round's median is reported: a burst of other
+    # load on the machine spoils one round, not the number. No garbage collection while timing.
+    size = max(1, samples // rounds)
+    times = []
+    medians = []
+    perf_counter = time.perf_counter
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(samples):
+            if prepare:
+                prepare(i)
+            start = perf_counter()
+            call()
+            times.append(perf_counter() - start)
+            if len(times) % size == 0:
+                medians.append(statistics.median(times[-size:]))
+    finally:
+        gc.enable()
+    times.sort()
+    return {
+        "median_us": min(medians) * 1e6,
+        "p90_us": times[len(times) * 9 // 10] * 1e6,
+        "min_us": times[0] * 1e6,
+        "samples": samples,
+    }
+
+
+def engine_cases(samples):
+    # (name, samples, prepare, call) for everything that runs outside main.py
+    for name, char_data in CHARACTER_DATA.items():
+        sheet, steps = char_data["sheet"], char_data["animations"]
+        fighter = build_fighter(FightState(clock=ManualClock(), sound_on=False), 1, name, 300, False)
+
+        def forget(i, sheet=sheet):
+            SHEET_CACHE.pop(sheet, None)
+            for key in [key for key in ANIMATION_CACHE if key[0] == sheet]:
+                del ANIMATION_CACHE[key]
+
+        yield f"load_images/{name}", LOAD_SAMPLES, forget, lambda: fighter.load_images(sheet, steps)
+    screen = pygame.display.get_surface()
+    for name, stats in CHARACTER_STATS.items():
+        special = SPECIAL_NAMES[stats.special_type]
+        fight, states = record_fight((name, opponent(name)))
+        fighter, target = fight.fighter_1, fight.fighter_2
+
+        def restore(i):
+            fight.restore(states[i % len(states)])
+
+        def in_reach(i, attack_type=None):
+            # An attack (cycling through the three types) or a special cast, the target in range
+            restore(i)
+            fighter.attack_type = attack_type or (1, 2, 8)[i % 3]
+            fighter.attack_cancelled = False
+            fighter.attack_target = target
+            if target.stunned:
+                target.clear_status(STATUS_STUN)
+            target.rect.topleft = (fighter.rect.x + (-60 if fighter.flip else 60), fighter.rect.y)
+
+        yield (f"move/{special}", samples, restore,
+               lambda: fighter.move(SCREEN_WIDTH, SCREEN_HEIGHT, screen, target, False))
+        yield f"update/{special}", samples, restore, fighter.update
+        yield f"apply_attack_damage/{special}", samples, in_reach, fighter.apply_attack_damage
+        yield f"apply_special_effect/{special}", samples, lambda i: in_reach(i, 8), fighter.apply_special_effect
+        yield f"draw/{name}", samples, restore, lambda: fighter.draw(screen, 0.5)
+
+
+def frame_helper_cases(game, samples):
+    # game is main.py's globals: its helpers read fight, the mouse state and match_history from there
+    fight, states = record_fight(("Sage", "Knight"))
+    game["fight"] = fight
+    game["mx"] = game["my"] = 0
+    game["md"] = False
+    fighter = fight.fighter_1
+
+    def restore(i):
+        fight.restore(states[i % len(states)])
+
+    def cursed(i):
+        restore(i)
+        fight.add_curse(fighter, fight.fighter_2)
+
+    def lifted(i):
+        restore(i)
+        for curse in list(fight.statuses.effects):
+            fight.end_curse(curse)
+
+    yield "draw_bg/background", samples, lifted, game["draw_bg"]
+    yield "draw_bg/curse", samples, cursed, game["draw_bg"]
+    yield "hud/draw_health_value", samples, restore, lambda: game["draw_health_value"](fighter.health, 20, 20)
+    yield "hud/draw_stamina_value", samples, restore, lambda: game["draw_stamina_value"](fighter, 0, 50, False)
+    yield "hud/draw_cooldown_value", samples, restore, lambda: game["draw_cooldown_value"](fighter, 20, 80)
+    yield "hud/draw_pause_button", samples, restore, game["draw_pause_button"]
+    yield "draw_fight", samples, restore, lambda: game["draw_fight"](0.5)
+    pacer = game["pacer"]
+    pacer.level = LEVEL_LOW_RES
+    yield "draw_fight/low_res", samples, restore, lambda: game["draw_fight"](0.5)
+    pacer.level = LEVEL_FULL
+    with tempfile.TemporaryDirectory() as folder:
+        history = HistoryStore(os.path.join(folder, "history.db"))
+        for i in range(game["HISTORY_SHOWN"]):
+            history.add("Sage", "Knight", "PVE", "Player 1", False, 1.7e9 + i * 600)
+        saved = game["match_history"]
+        game["match_history"] = history
+        try:
+            yield "draw_history", samples, None, game["draw_history"]
+        finally:
+            game["match_history"] = saved
+            history.close()
+
+
+def run_cases(cases, pattern=None, out=None):
+    results = {}
+    for name, samples, prepare, call in cases:
+        if pattern and pattern not in name:
+            continue
+        results[name] = time_calls(samples, prepare, call)
+        if out:
+            print_result(name, results[name], out)
+    return results
+
+
+def frame_helper_results(game, samples):
+    # Called by python main.py --microbench N
+    return run_cases(frame_helper_cases(game, samples))
+
+
+def print_result(name, result, out=sys.stdout):
+    print(f"{name:<36}{result['median_us']:>12.1f}{result['p90_us']:>12.1f}{result['min_us']:>12.1f}", file=out)
+
+
+def run_suite(samples, pattern=None):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f"{'case':<36}{'median us':>12}{'p90 us':>12}{'min us':>12}")
+    results = run_cases(engine_cases(samples), pattern, sys.stdout)
+    # main.py's helpers, timed inside the game
+    game = subprocess.run([sys.executable, "main.py", "--microbench", str(samples)], cwd=GAME_DIR,
+                          env=game_environment(), capture_output=True, text=True, timeout=600)
+    lines = [line for line in game.stdout.splitlines() if line.startswith("MICROBENCH ")]
+    if not lines:
+        raise RuntimeError(f"main.py --microbench failed (code {game.returncode}):\n{game.stderr.strip()}")
+    for name, result in json.loads(lines[0][len("MICROBENCH "):]).items():
+        if not pattern or pattern in name:
+            results[name] = result
+            print_result(name, result)
+    return {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "samples": samples,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, pattern=None, noise_us=NOISE_US):
+    # Prints both medians per case and returns the names of the regressions
+    print(f"{'case':<36}{'baseline us':>13}{'current us':>12}{'change':>9}")
+    regressions = []
+    old, new = baseline["results"], current["results"]
+    for name in list(old) + [name for name in new if name not in old]:
+        if pattern and pattern not in name:
+            continue
+        if name not in new or name not in old:
+            print(f"{name:<36}{'only in ' + ('baseline' if name in old else 'current'):>34}")
+            continue
+        before, after = old[name]["median_us"], new[name]["median_us"]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold and after - before > noise_us:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif change < -threshold and before - after > noise_us:
+            flag = "  faster"
+        print(f"{name:<36}{before:>13.1f}{after:>12.1f}{change:>+8.1f}%{flag}")
+    return regressions
+
+
+def load_results(path):
+    with open(path, 'r') as f:
+        results = json.load(f)
+    if results.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {results.get('version')}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the fighter rules and drawing helpers "
+                                                 "(dummy SDL drivers), with JSON baselines")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="timed calls per case")
+    parser.add_argument("--filter", help="only cases whose name contains this")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved baseline")
+    parser.add_argument("--current", metavar="FILE", help="with --compare: saved results instead of a new run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="percent slower that fails")
+    args = parser.parse_args()
+    baseline = load_results(args.compare) if args.compare else None
+    if args.current:
+        if not baseline:
+            parser.error("--current needs --compare")
+        current = load_results(args.current)
+    else:
+        current = run_suite(args.samples, args.filter)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=1)
+        print(f"saved {len(current['results'])} cases to {args.save}")
+    if baseline:
+        print()
+        regressions = compare(baseline, current, args.threshold, args.filter)
+        if regressions:
+            print(f"{len(regressions)} case(s) more than {args.threshold:g}% slower: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"no case more than {args.threshold:g}% slower")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import argparse
+import heapq
+import os
+import random
+import socket
+import struct
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import (FPS, CHARACTER_DATA, CHARACTER_NAMES, SNAPSHOT_SIZE, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP,
+                    INPUT_BLOCK, INPUT_ATTACK1, INPUT_ATTACK2, INPUT_SPECIAL, FightState, ManualClock, build_fighter)
+from replay import Replay, ReplayPlayer
+
+# -----------------------------------------------------------------------------------------------------ROLLBACK NETPLAY
+# Online PVP. Each peer runs the whole fight from its own inputs and the other's, and never waits
+# for the network: a remote input that hasn't arrived yet is predicted (the last confirmed one is
+# repeated). When the real input turns out different, the fight is restored from the snapshot taken
+# before that tick and re-simulated up to now with the corrected inputs. Local inputs are applied
+# input_delay ticks late, which gives them that long to reach the peer and makes rollbacks rarer
+# and shorter. A peer more than max_rollback ticks ahead of the inputs it has from the other side
+# stops and waits for them.
+#
+# Packets are UDP. Every input packet repeats the local inputs the peer hasn't acknowledged yet, so
+# a lost packet is covered by the next one and nothing is resent on a timer.
+PACKET_MAGIC = b"SMFN"
+KIND_HELLO = 0
+KIND_INPUTS = 1
+HELLO = struct.Struct("<4sBBBI")  # magic, kind, player, character index, seed
+INPUTS = struct.Struct("<4sBII")  # magic, kind, ack (last tick received from the peer), first tick; one byte per tick
+MAX_SEND = 64  # Inputs per packet
+HELLO_INTERVAL = 0.1
+DEFAULT_PORT = 7250
+DEFAULT_INPUT_DELAY = 2
+MAX_ROLLBACK = 8
+
+
+class UdpLink:
+    # Non-blocking UDP socket talking to one peer. latency_ms, jitter_ms and loss make it a bad
+    # connection on the sending side, to test on localhost; now is the time source in seconds.
+    def __init__(self, port=0, peer=None, latency_ms=0, jitter_ms=0, loss=0.0, seed=None, now=time.monotonic):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("", port))  # Port 0 picks a free one
+        self.sock.setblocking(False)
+        self.peer = None
+        if peer:
+            self.connect(*peer)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.now = now
+        self.delayed = []  # (due, number, data) of packets held back by the simulated latency
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def port(self):
+        return self.sock.getsockname()[1]
+
+    def connect(self, host, port):
+        self.peer = (socket.gethostbyname(host), port)
+
+    def send(self, data):
+        self.sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+        elif self.latency or self.jitter:
+            due = self.now() + self.latency + self.rng.random() * self.jitter
+            heapq.heappush(self.delayed, (due, self.sent, data))
+        else:
+            self.transmit(data)
+
+    def transmit(self, data):
+        try:
+            self.sock.sendto(data, self.peer)
+        except OSError:
+            pass  # Nobody listening yet; the next packet repeats everything anyway
+
+    def receive(self):
+        # Sends the delayed packets that are due, then returns every packet from the peer that arrived
+        now = self.now()
+        while self.delayed and self.delayed[0][0] <= now:
+            self.transmit(heapq.heappop(self.delayed)[2])
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except BlockingIOError:
+                return packets
+            except ConnectionResetError:
+                continue  # Windows reports an earlier packet to a closed port here
+            if address == self.peer and data.startswith(PACKET_MAGIC) and len(data) > len(PACKET_MAGIC):
+                packets.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class Handshake:
+    # Both peers send HELLO (player number, character, and a seed) until they have the other's.
+    # Player 1's seed is the fight's, so both sides build the same fight.
+    def __init__(self, link, player, character, seed=None):
+        self.link = link
+        self.player = player
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.hello = HELLO.pack(PACKET_MAGIC, KIND_HELLO, player, CHARACTER_NAMES.index(character), self.seed)
+        self.characters = [None, None]
+        self.characters[player - 1] = character
+        self.last_sent = None
+
+    @property
+    def done(self):
+        return None not in self.characters
+
+    def poll(self):
+        now = self.link.now()
+        if self.last_sent is None or now - self.last_sent >= HELLO_INTERVAL:
+            self.link.send(self.hello)
+            self.last_sent = now
+        for data in self.link.receive():
+            if data[4] == KIND_HELLO and len(data) >= HELLO.size:
+                _, _, player, character, seed = HELLO.unpack_from(data)
+                if player != self.player and character < len(CHARACTER_NAMES):
+                    self.characters[player - 1] = CHARACTER_NAMES[character]
+                    if player == 1:
+                        self.seed = seed
+        return self.done
+
+
+class RollbackSession:
+    def __init__(self, fight, link, player, input_delay=DEFAULT_INPUT_DELAY, max_rollback=MAX_ROLLBACK,
+                 hello=None, replay=None):
+        self.fight = fight
+        self.link = link
+        self.player = player
+        self.local_index = player - 1
+        self.remote_index = 2 - player
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        self.hello = hello  # Sent again whenever the peer's HELLO arrives, in case ours was lost
+        self.replay = replay  # Records the confirmed inputs only
+        self.local = {tick: 0 for tick in range(1, input_delay + 1)}  # tick -> local bits
+        self.remote = {}  # tick -> remote bits, as received
+        self.predicted = {}  # tick -> remote bits the simulation guessed, until the real ones arrive
+        self.confirmed = 0  # Every remote input up to this tick has arrived
+        self.peer_ack = 0  # The peer has every local input up to this tick
+        self.recorded = 0
+        self.ring = max_rollback + 2
+        self.states = bytearray(SNAPSHOT_SIZE * self.ring)  # Fight state before tick t at slot t % ring
+        self.sound_on = fight.sound_on
+        self.winner = None
+        self.stalls = 0
+        self.rollbacks = 0
+        self.rollback_ticks = 0
+        self.max_rollback_ticks = 0
+        self.max_rollback_seconds = 0.0
+
+    @property
+    def tick(self):
+        return self.fight.clock.frames
+
+    def advance(self, bits):
+        # One tick of online play: apply what the peer sent (rolling back if a guess was wrong),
+        # then simulate the next tick with the local input unless too far ahead of the peer.
+        # Returns the winner once, when the tick that ended the round can no longer roll back.
+        # Once the result is settled, the rest of the round (the end-of-round pause) plays out locally
+        if self.winner is None:
+            self.receive()
+        tick = self.tick
+        if self.winner is None and tick + 1 - self.confirmed > self.max_rollback:
+            self.stalls += 1
+        else:
+            self.local[tick + 1 + self.input_delay] = bits
+            self.simulate(tick + 1)
+        self.send()
+        self.record()
+        return self.result()
+
+    def poll(self):
+        # Keeps the connection going without simulating
+        self.receive()
+        self.send()
+        self.record()
+        return self.result()
+
+    def simulate(self, tick):
+        fight = self.fight
+        fight.snapshot(self.states, tick % self.ring * SNAPSHOT_SIZE)
+        remote = self.remote.get(tick)
+        if remote is None:
+            remote = self.predicted[tick] = self.remote.get(self.confirmed, 0)
+        inputs = [0, 0]
+        inputs[self.local_index] = self.local[tick]
+        inputs[self.remote_index] = remote
+        fight.inputs = inputs
+        fight.clock.tick()
+        fight.step()
+
+    def rollback(self, tick):
+        start = time.perf_counter()
+        fight = self.fight
+        end = self.tick
+        fight.restore(self.states, tick % self.ring * SNAPSHOT_SIZE)
+        fight.sound_on = False  # Sounds already played the first time through
+        for resimulated in range(tick, end + 1):
+            self.simulate(resimulated)
+        fight.sound_on = self.sound_on
+        elapsed = time.perf_counter() - start
+        ticks = end + 1 - tick
+        self.rollbacks += 1
+        self.rollback_ticks += ticks
+        self.max_rollback_ticks = max(self.max_rollback_ticks, ticks)
+        self.max_rollback_seconds = max(self.max_rollback_seconds, elapsed)
+
+    def receive(self):
+        rollback_to = None
+        for data in self.link.receive():
+            if data[4] == KIND_HELLO:
+                if self.hello:
+                    self.link.send(self.hello)
+                continue
+            if data[4] != KIND_INPUTS or len(data) < INPUTS.size:
+                continue
+            _, _, ack, first = INPUTS.unpack_from(data)
+            self.peer_ack = max(self.peer_ack, ack)
+            for tick, bits in enumerate(data[INPUTS.size:], first):
+                if tick in self.remote:
+                    continue
+                self.remote[tick] = bits
+                predicted = self.predicted.pop(tick, None)
+                if predicted is not None and predicted != bits and (rollback_to is None or tick < rollback_to):
+                    rollback_to = tick
+        while self.confirmed + 1 in self.remote:
+            self.confirmed += 1
+        if rollback_to is not None:
+            self.rollback(rollback_to)
+
+    def send(self):
+        first = self.peer_ack + 1
+        last = min(self.tick + self.input_delay, first + MAX_SEND - 1)
+        bits = bytes(self.local[tick] for tick in range(first, last + 1))
+        self.link.send(INPUTS.pack(PACKET_MAGIC, KIND_INPUTS, self.confirmed, first) + bits)
+
+    def record(self):
+        end = min(self.confirmed, self.tick)
+        while self.recorded < end:
+            self.recorded += 1
+            tick = self.recorded
+            inputs = [0, 0]
+            inputs[self.local_index] = self.local[tick]
+            inputs[self.remote_index] = self.remote[tick]
+            if self.replay:
+                self.replay.record(tick, inputs, False)
+
+    def result(self):
+        fight = self.fight
+        if self.winner is None and fight.round_over and self.confirmed >= self.tick:
+            self.winner = "Player 2" if not fight.fighter_1.alive else "Player 1"
+            return self.winner
+        return None
+
+    def close(self):
+        self.link.close()
+
+
+def netplay_options(argv):
+    # python main.py --netplay HOST[:PORT] --player N ...; None when not playing online
+    if "--netplay" not in argv:
+        return None
+    parser = argparse.ArgumentParser(prog="main.py", description="Play PVP online against another main.py")
+    parser.add_argument("--netplay", metavar="HOST[:PORT]", required=True, help="the other player's address")
+    parser.add_argument("--player", type=int, choices=[1, 2], required=True, help="1 on one side, 2 on the other")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="local UDP port")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    host, _, port = args.netplay.rpartition(":") if ":" in args.netplay else (args.netplay, "", DEFAULT_PORT)
+    args.peer = (host, int(port))
+    return args
+
+
+def add_arguments(parser):
+    parser.add_argument("--input-delay", type=int, default=DEFAULT_INPUT_DELAY, help="ticks before a local input applies")
+    parser.add_argument("--max-rollback", type=int, default=MAX_ROLLBACK, help="ticks a peer may run ahead")
+    parser.add_argument("--latency", type=float, default=0, help="simulated one-way latency in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="simulated extra random latency in ms")
+    parser.add_argument("--loss", type=float, default=0, help="simulated packet loss (0-1)")
+
+
+# ----------------------------------------------------------------------------------------------------LOCALHOST TEST
+# Two peers in one process over real UDP sockets on localhost, each mashing seeded random inputs,
+# on a virtual clock so simulated latency doesn't make the test slow. Checks that both end in the
+# same state as a re-simulation of the confirmed inputs, and reports rollback cost.
+MASH = (0, 0, INPUT_LEFT, INPUT_RIGHT, INPUT_RIGHT | INPUT_JUMP, INPUT_LEFT | INPUT_JUMP, INPUT_BLOCK,
+        INPUT_ATTACK1, INPUT_ATTACK2, INPUT_SPECIAL, INPUT_RIGHT | INPUT_ATTACK1)
+
+
+class VirtualTime:
+    def __init__(self):
+        self.seconds = 0.0
+
+    def now(self):
+        return self.seconds
+
+
+class Masher:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.bits = 0
+        self.left = 0
+
+    def next(self):
+        if self.left <= 0:
+            self.bits = self.rng.choice(MASH)
+            self.left = self.rng.randint(3, 30)
+        self.left -= 1
+        return self.bits
+
+
+def localhost_test(char_1, char_2, ticks, args):
+    virtual = VirtualTime()
+    links = [UdpLink(0, None, args.latency, args.jitter, args.loss, args.seed + player, virtual.now)
+             for player in (1, 2)]
+    links[0].connect("127.0.0.1", links[1].port)
+    links[1].connect("127.0.0.1", links[0].port)
+    handshakes = [Handshake(links[0], 1, char_1, args.seed), Handshake(links[1], 2, char_2)]
+    while not all([handshake.poll() for handshake in handshakes]):
+        virtual.seconds += 1 / FPS
+        time.sleep(0.0005)  # Give the loopback interface a moment
+    sessions = []
+    for link, handshake in zip(links, handshakes):
+        fight = FightState(clock=ManualClock(), seed=handshake.seed, sound_on=False)
+        fight.fighter_1 = build_fighter(fight, 1, handshake.characters[0], 300, False)
+        fight.fighter_2 = build_fighter(fight, 2, handshake.characters[1], 600, True)
+        replay = Replay(handshake.seed, handshake.characters, (False, False), "ONLINE")
+        sessions.append(RollbackSession(fight, link, handshake.player, args.input_delay, args.max_rollback,
+                                        handshake.hello, replay))
+    mashers = [Masher(args.seed * 2 + 1), Masher(args.seed * 2 + 2)]
+    frames = 0
+    start = time.perf_counter()
+    while any(session.tick < ticks or session.confirmed < ticks for session in sessions):
+        frames += 1
+        virtual.seconds += 1 / FPS
+        for session, masher in zip(sessions, mashers):
+            if session.tick < ticks:
+                session.advance(masher.next())
+            else:
+                session.poll()
+        time.sleep(0.0001)
+    elapsed = time.perf_counter() - start
+
+    player = ReplayPlayer(sessions[0].replay)
+    player.seek(ticks)
+    reference = player.fight.snapshot()
+    same = all(session.fight.snapshot() == reference for session in sessions)
+    print(f"{char_1} vs {char_2}: {ticks} ticks in {frames} frames ({elapsed:.2f}s), input delay "
+          f"{args.input_delay}, latency {args.latency:g}+{args.jitter:g} ms, loss {args.loss:.0%}")
+    for session in sessions:
+        link = session.link
+        average = session.rollback_ticks / max(1, session.rollbacks)
+        print(f"  player {session.player}: {session.rollbacks} rollbacks ({average:.1f} ticks average, "
+              f"{session.max_rollback_ticks} max, {session.max_rollback_seconds * 1000:.2f} ms worst), "
+              f"{session.stalls} stalled frames, {link.sent} packets sent, {link.dropped} dropped")
+    print(f"  both peers match the re-simulated confirmed inputs: {'yes' if same else 'NO'}")
+    for link in links:
+        link.close()
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test rollback netplay between two local peers "
+                                                 "(python main.py --netplay ... plays online)")
+    parser.add_argument("fighter1", nargs="?", default="Knight", choices=list(CHARACTER_DATA))
+    parser.add_argument("fighter2", nargs="?", default="Mage", choices=list(CHARACTER_DATA))
+    parser.add_argument("--ticks", type=int, default=FPS * 60)
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+    if not localhost_test(args.fighter1, args.fighter2, args.ticks, args):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
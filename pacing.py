@@ -0,0 +1,75 @@
+from collections import deque
+
+# ---------------------------------------------------------------------------------------------------------FRAME PACING
+# Fights run on a fixed tick accumulator, so a machine that can't keep up doesn't slow the game
+# down, it shows fewer and later frames. The pacer watches how long recent frames took to build
+# (Clock.get_rawtime(), the work without the wait in tick) and, while they don't fit the frame
+# budget, steps fight rendering down a level at a time; once frames fit with room to spare it
+# steps back up. A step up that has to be undone soon after waits twice as long before the next
+# try, so a machine on the edge doesn't flicker between two levels.
+LEVEL_FULL = 0
+LEVEL_LOW_RES = 1  # Background and fighters drawn at half resolution and scaled up, the HUD at full
+LEVEL_HALF_RATE = 2  # ... and only every other frame drawn and presented; the fight keeps ticking
+LEVEL_THIRD_RATE = 3  # ... every third frame
+LEVEL_NAMES = ["full", "low res", "1/2 frames", "1/3 frames"]
+PRESENT_EVERY = [1, 1, 2, 3]
+LOW_RES_SCALE = 0.5
+WINDOW = 30  # Frames averaged before a decision
+SETTLE = 60  # Frames after a change before the next one
+HELD = 4 * SETTLE  # A step up that lasts this long worked
+MAX_BACKOFF = 60 * 30
+OVERLOAD = 1.0  # Average work over this share of the budget steps down...
+HEADROOM = 0.5  # ... under this share steps up
+
+
+class FramePacer:
+    def __init__(self, budget_ms, window=WINDOW, max_level=LEVEL_THIRD_RATE):
+        self.budget_ms = budget_ms
+        self.max_level = max_level
+        self.work = deque(maxlen=window)
+        self.level = LEVEL_FULL
+        self.frame = 0
+        self.wait = SETTLE  # Frames until the level may change again
+        self.backoff = SETTLE  # Frames to stay down before trying a step up again
+        self.up_after = 0
+        self.raised_at = None
+        self.changes = 0
+
+    @property
+    def low_res(self):
+        return self.level >= LEVEL_LOW_RES
+
+    def presents(self):
+        # Whether the current frame is drawn and shown
+        return self.frame % PRESENT_EVERY[self.level] == 0
+
+    def record(self, work_ms):
+        # One frame's work; returns True when the level changed
+        self.frame += 1
+        self.work.append(work_ms)
+        if self.raised_at is not None and self.frame - self.raised_at >= HELD:
+            self.raised_at = None
+            self.backoff = SETTLE
+        if self.wait > 0:
+            self.wait -= 1
+            return False
+        if len(self.work) < self.work.maxlen:
+            return False
+        average = sum(self.work) / len(self.work)
+        if average > self.budget_ms * OVERLOAD and self.level < self.max_level:
+            if self.raised_at is not None:
+                self.backoff = min(self.backoff * 2, MAX_BACKOFF)  # The last step up didn't hold
+                self.raised_at = None
+            self.up_after = self.frame + self.backoff
+            return self.set_level(self.level + 1)
+        if average < self.budget_ms * HEADROOM and self.level > LEVEL_FULL and self.frame >= self.up_after:
+            self.raised_at = self.frame
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.level = level
+        self.wait = SETTLE
+        self.work.clear()
+        self.changes += 1
+        return True
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+# ---------------------------------------------------------------------------------------------------PERSISTENCE WORKER
+# Disk writes leave the frame loop: files are handed over as finished bytes and written on a
+# background thread. Repeated writes to one path within the delay collapse into the last one, every
+# file is replaced atomically (temp file, fsync, rename), and other jobs (history inserts) run in order.
+class PersistenceWorker:
+    def __init__(self, delay=0.5):
+        self.delay = delay
+        self.cond = threading.Condition()
+        self.files = {}  # path -> (due time, data)
+        self.calls = deque()
+        self.busy = False
+        self.running = True
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def write(self, path, data, delay=None):
+        due = time.monotonic() + (self.delay if delay is None else delay)
+        with self.cond:
+            self.files[path] = (due, data)
+            self.cond.notify_all()
+
+    def write_json(self, path, obj, delay=None):
+        # Serialized now, so later changes to obj don't leak into the write
+        self.write(path, json.dumps(obj), delay)
+
+    def call(self, func, *args):
+        with self.cond:
+            self.calls.append((func, args))
+            self.cond.notify_all()
+
+    def flush(self):
+        # Writes everything still pending right away and waits for it
+        with self.cond:
+            for path, (_, data) in self.files.items():
+                self.files[path] = (0, data)
+            self.cond.notify_all()
+            while self.files or self.calls or self.busy:
+                self.cond.wait()
+
+    def close(self):
+        self.flush()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join()
+
+    def next_job(self):
+        # Called with the lock held; blocks until a job is due or the worker is stopped
+        while True:
+            if self.calls:
+                return self.calls.popleft()
+            now = time.monotonic()
+            for path, (due, data) in self.files.items():
+                if due <= now:
+                    del self.files[path]
+                    return write_atomic, (path, data)
+            if not self.running:
+                return None
+            timeout = min(due for due, _ in self.files.values()) - now if self.files else None
+            self.cond.wait(timeout)
+
+    def work(self):
+        while True:
+            with self.cond:
+                job = self.next_job()
+                if job is None:
+                    return
+                self.busy = True
+            func, args = job
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Background save failed: {e}")
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+
+def write_atomic(path, data):
+    # Readers see the old file or the new one, never a half-written one
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    temp = path + ".tmp"
+    with open(temp, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
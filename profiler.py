@@ -0,0 +1,93 @@
+import csv
+import time
+from array import array
+import pygame
+
+# ------------------------------------------------------------------------------------------------------FRAME PROFILER
+# Per-phase frame times kept in a fixed-size ring buffer. mark(phase) charges the time since the
+# previous mark to that phase, so the main loop only needs one call after each phase.
+PHASES = ["events", "status_effects", "move", "update", "draw_bg", "hud", "draw_fighters", "menu", "overlay",
+          "display_update", "startup"]
+OVERLAY_REFRESH = 30  # Frames between overlay redraws; the text itself would otherwise cost a phase
+
+
+class FrameProfiler:
+    def __init__(self, size=600, budget_ms=1000 / 60, phases=PHASES):
+        self.size = size
+        self.budget_ms = budget_ms
+        self.phases = list(phases)
+        self.columns = self.phases + ["frame"]
+        self.samples = {name: array('d', [0.0]) * size for name in self.columns}
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self.missed = 0
+        self.frame_start = self.last = time.perf_counter()
+        self.overlay = None
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        for name in self.phases:
+            self.current[name] = 0.0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        i = self.index
+        for name in self.phases:
+            self.samples[name][i] = self.current[name] * 1000
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.samples["frame"][i] = frame_ms
+        if frame_ms > self.budget_ms:
+            self.missed += 1
+        self.index = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.frames += 1
+
+    def recent(self, name):
+        # Samples in the buffer, oldest first
+        samples = self.samples[name]
+        if self.count < self.size:
+            return list(samples[:self.count])
+        return list(samples[self.index:]) + list(samples[:self.index])
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        samples = sorted(self.recent(name))
+        if not samples:
+            return [0.0 for _ in points]
+        return [samples[min(len(samples) - 1, len(samples) * p // 100)] for p in points]
+
+    def missed_recent(self):
+        return sum(1 for ms in self.recent("frame") if ms > self.budget_ms)
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in self.columns])
+            first = self.frames - self.count
+            rows = zip(*(self.recent(name) for name in self.columns))
+            for n, row in enumerate(rows):
+                writer.writerow([first + n] + [f"{ms:.3f}" for ms in row])
+
+    def draw_overlay(self, surface, font, status=None):
+        if self.overlay is None or self.frames % OVERLAY_REFRESH == 0:
+            lines = [f"{'phase':<15}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for name in self.columns:
+                p50, p95, p99 = self.percentiles(name)
+                lines.append(f"{name:<15}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+            lines.append(f"missed {self.budget_ms:.1f} ms: {self.missed_recent()}/{self.count} "
+                         f"(total {self.missed})")
+            if status:
+                lines.append(status)
+            height = font.get_linesize()
+            rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+            self.overlay = pygame.Surface((max(s.get_width() for s in rendered) + 16, height * len(lines) + 12))
+            self.overlay.set_alpha(190)
+            for i, text in enumerate(rendered):
+                self.overlay.blit(text, (8, 6 + i * height))
+        surface.blit(self.overlay, (surface.get_width() - self.overlay.get_width() - 10,
+                                    surface.get_height() - self.overlay.get_height() - 10))
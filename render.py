@@ -0,0 +1,107 @@
+import io
+from collections import OrderedDict
+import pygame
+
+
+# -----------------------------------------------------------------------------------------------------------LAYER CACHE
+# Full-screen static layers (backgrounds, frames, overlays) scaled once to each size they're drawn
+# at (the screen, and half of it in the low-resolution mode) and converted to the display's pixel
+# format.
+class LayerCache:
+    def __init__(self):
+        self.sources = {}
+        self.layers = {}  # (name, size) -> Surface
+
+    def register(self, name, source, alpha=False):
+        # source is an image path or a Surface; only layers with transparency keep an alpha channel
+        self.sources[name] = (source, alpha)
+        for key in [key for key in self.layers if key[0] == name]:
+            del self.layers[key]
+
+    def get(self, name, size):
+        key = (name, size)
+        layer = self.layers.get(key)
+        if layer is None:
+            source, alpha = self.sources[name]
+            image = pygame.image.load(source) if isinstance(source, str) else source
+            if image.get_size() != size:
+                image = pygame.transform.scale(image, size)
+            layer = self.layers[key] = image.convert_alpha() if alpha else image.convert()
+        return layer
+
+    def draw(self, surface, name, pos=(0, 0)):
+        surface.blit(self.get(name, surface.get_size()), pos)
+
+
+# -------------------------------------------------------------------------------------------------------------FONT BOOK
+# Named sizes of one font file, opened on first use instead of at startup. The file is read once
+# and names with the same size share a Font.
+class FontBook:
+    def __init__(self, path, sizes):
+        self.path = path
+        self.sizes = sizes  # name -> point size
+        self.data = None
+        self.fonts = {}  # point size -> Font
+
+    def __getitem__(self, name):
+        size = self.sizes[name]
+        font = self.fonts.get(size)
+        if font is None:
+            if self.data is None:
+                with open(self.path, 'rb') as f:
+                    self.data = f.read()
+            font = self.fonts[size] = pygame.font.Font(io.BytesIO(self.data), size)
+        return font
+
+
+# ------------------------------------------------------------------------------------------------------------TEXT CACHE
+# Rendered text surfaces keyed by (font, text, color), least recently used first out once the
+# cache goes over its memory cap. Numbers that change every frame go through a GlyphAtlas instead.
+class TextCache:
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+        surf = font.render(text, True, color)
+        self.surfaces[key] = surf
+        self.bytes += surface_bytes(surf)
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return surf
+
+    def atlas(self, font, color):
+        key = (font, color)
+        if key not in self.atlases:
+            self.atlases[key] = GlyphAtlas(font, color)
+        return self.atlases[key]
+
+
+class GlyphAtlas:
+    # Digits rendered once; a number is drawn by blitting one glyph per character
+    def __init__(self, font, color, chars="0123456789-"):
+        self.glyphs = {char: font.render(char, True, color) for char in chars}
+
+    def width(self, text):
+        return sum(self.glyphs[char].get_width() for char in text)
+
+    def draw(self, surface, text, x, y):
+        blits = []
+        for char in text:
+            glyph = self.glyphs[char]
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(blits, doreturn=False)
+        return x
+
+
+def surface_bytes(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
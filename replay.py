@@ -0,0 +1,194 @@
+import argparse
+import os
+import struct
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import FPS, FightState, ManualClock, build_fighter
+from ai import InputPolicy
+
+# ------------------------------------------------------------------------------------------------------------REPLAYS
+# A replay is the fight seed plus the per-tick input bitmasks of both players and the pause flag.
+# AI fighters replay themselves from the seed, except "scripted" ones (the lookahead AI, whose
+# time-budgeted search isn't repeatable): their chosen bitmasks are recorded like a player's.
+# Only ticks where something changed are stored: varint tick delta, then two bytes
+# (player 1 bits | paused << 7, player 2 bits). A whole match is usually a few KB.
+REPLAY_MAGIC = b"SMFGR"
+REPLAY_VERSION = 3  # 2: fights draw from FightRandom; 3: Sage curses stack
+HEADER = struct.Struct("<BIHIB")  # version, seed, tick rate, total ticks, AI flags (bits 0-1 AI, 2-3 scripted)
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def write_text(out, text):
+    encoded = text.encode("utf-8")
+    out.append(len(encoded))
+    out += encoded
+
+
+def read_text(data, pos):
+    length = data[pos]
+    return data[pos + 1:pos + 1 + length].decode("utf-8"), pos + 1 + length
+
+
+class Replay:
+    def __init__(self, seed, names, is_ai, game_mode, tick_rate=FPS, scripted=(False, False)):
+        self.seed = seed
+        self.names = list(names)
+        self.is_ai = list(is_ai)
+        self.scripted = list(scripted)
+        self.game_mode = game_mode
+        self.tick_rate = tick_rate
+        self.ticks = 0
+        self.changes = []  # (tick, player 1 bits, player 2 bits, paused), one per change
+
+    def record(self, tick, inputs, paused):
+        state = (inputs[0], inputs[1], paused)
+        if not self.changes or self.changes[-1][1:] != state:
+            self.changes.append((tick,) + state)
+        self.ticks = tick
+
+    def to_bytes(self):
+        out = bytearray(REPLAY_MAGIC)
+        flags = int(self.is_ai[0]) | int(self.is_ai[1]) << 1 | int(self.scripted[0]) << 2 | int(self.scripted[1]) << 3
+        out += HEADER.pack(REPLAY_VERSION, self.seed, self.tick_rate, self.ticks, flags)
+        for text in self.names + [self.game_mode]:
+            write_text(out, text)
+        write_varint(out, len(self.changes))
+        last_tick = 0
+        for tick, bits_1, bits_2, paused in self.changes:
+            write_varint(out, tick - last_tick)
+            out.append(bits_1 | (0x80 if paused else 0))
+            out.append(bits_2)
+            last_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data.startswith(REPLAY_MAGIC):
+            raise ValueError("not a replay file")
+        pos = len(REPLAY_MAGIC)
+        version, seed, tick_rate, ticks, flags = HEADER.unpack_from(data, pos)
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        pos += HEADER.size
+        name_1, pos = read_text(data, pos)
+        name_2, pos = read_text(data, pos)
+        game_mode, pos = read_text(data, pos)
+        replay = cls(seed, (name_1, name_2), (bool(flags & 1), bool(flags & 2)), game_mode, tick_rate,
+                     (bool(flags & 4), bool(flags & 8)))
+        replay.ticks = ticks
+        count, pos = read_varint(data, pos)
+        tick = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            replay.changes.append((tick, data[pos] & 0x7F, data[pos + 1], bool(data[pos] & 0x80)))
+            pos += 2
+        return replay
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def headless_fight(replay):
+    fight = FightState(clock=ManualClock(replay.tick_rate), seed=replay.seed, sound_on=False)
+    fight.fighter_1 = build_fighter(fight, 1, replay.names[0], 300, False, replay.is_ai[0])
+    fight.fighter_2 = build_fighter(fight, 2, replay.names[1], 600, True, replay.is_ai[1])
+    script_fighters(fight, replay)
+    return fight
+
+
+def script_fighters(fight, replay):
+    for fighter, scripted in zip((fight.fighter_1, fight.fighter_2), replay.scripted):
+        if scripted:
+            fighter.ai_policy = InputPolicy()
+
+
+class ReplayPlayer:
+    # Re-runs a replay tick by tick. make_fight builds the FightState (headless by default, or with
+    # sprites for on-screen playback); seeking backwards restarts and fast-forwards from tick 0.
+    def __init__(self, replay, make_fight=headless_fight):
+        self.replay = replay
+        self.make_fight = make_fight
+        self.restart()
+
+    def restart(self):
+        self.fight = self.make_fight(self.replay)
+        self.next_change = 0
+        self.winner = None
+
+    @property
+    def tick(self):
+        return self.fight.clock.frames
+
+    @property
+    def finished(self):
+        return self.tick >= self.replay.ticks
+
+    def step(self):
+        fight = self.fight
+        fight.clock.tick()
+        changes = self.replay.changes
+        while self.next_change < len(changes) and changes[self.next_change][0] <= fight.clock.frames:
+            _, bits_1, bits_2, paused = changes[self.next_change]
+            fight.inputs = [bits_1, bits_2]
+            fight.game_paused = paused
+            self.next_change += 1
+        return fight.step()
+
+    def advance(self, ticks):
+        winner = None
+        for _ in range(min(ticks, self.replay.ticks - self.tick)):
+            winner = self.step() or winner
+        self.winner = self.winner or winner
+        return winner
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.replay.ticks))
+        if tick < self.tick:
+            self.restart()
+        self.advance(tick - self.tick)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or re-simulate a replay headlessly "
+                                                 "(python main.py --replay FILE plays it on screen)")
+    parser.add_argument("replay")
+    args = parser.parse_args()
+    replay = Replay.load(args.replay)
+    print(f"{replay.names[0]} vs {replay.names[1]} ({replay.game_mode}), seed {replay.seed}, "
+          f"{replay.ticks} ticks, {len(replay.changes)} input changes, {len(replay.to_bytes())} bytes")
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    player.seek(replay.ticks)
+    elapsed = time.perf_counter() - start
+    fighter_1, fighter_2 = player.fight.fighter_1, player.fight.fighter_2
+    print(f"winner: {player.winner or 'none'}  HP {fighter_1.health} / {fighter_2.health}  "
+          f"(re-simulated in {elapsed:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
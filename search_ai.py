@@ -0,0 +1,181 @@
+import math
+import random
+import time
+from ai import AIPolicy, Perception
+from engine import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_BLOCK, INPUT_ATTACK1, INPUT_ATTACK2, INPUT_SPECIAL
+
+# ---------------------------------------------------------------------------------------------------------LOOKAHEAD AI
+# The hard PVE opponent. Instead of fixed thresholds it tries short action plans on a copy of the
+# fight, using the real combat rules, and plays the plan that worked out best. The search is an
+# open-loop Monte Carlo tree over macro actions (one action held for MACRO_TICKS): each iteration
+# restores the copy from a snapshot of the fight, plays the rest of the current action, the plan in
+# the tree, then the character's normal policy up to the horizon, and scores the health swing. The
+# opponent is modelled by its own character policy. Searching stops at a hard per-tick time budget,
+# and the tree is kept between ticks: when an action finishes, the subtree of the one just played
+# becomes the new root.
+#
+# The search AI plays through input bitmasks like a human, writing them to fight.inputs, so
+# replays record its choices and play them back without searching again.
+HOLD, APPROACH, RETREAT, BLOCK, ATTACK1, ATTACK2, SPECIAL, JUMP = range(8)
+ACTIONS = (HOLD, APPROACH, RETREAT, BLOCK, ATTACK1, ATTACK2, SPECIAL, JUMP)
+MACRO_TICKS = 8
+HORIZON_TICKS = 45  # Long enough for a basic attack to land
+PLAN_DEPTH = 2
+BUDGET_MS = 2.0
+
+
+def action_mask(action, direction):
+    toward = INPUT_RIGHT if direction > 0 else INPUT_LEFT
+    if action == APPROACH:
+        return toward
+    if action == RETREAT:
+        return INPUT_LEFT if toward == INPUT_RIGHT else INPUT_RIGHT
+    if action == JUMP:
+        return INPUT_JUMP | toward
+    return {BLOCK: INPUT_BLOCK, ATTACK1: INPUT_ATTACK1, ATTACK2: INPUT_ATTACK2, SPECIAL: INPUT_SPECIAL}.get(action, 0)
+
+
+class Node:
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+
+class ScriptedPolicy(AIPolicy):
+    # Plays a list of (last tick, action) steps inside a rollout, then hands over to the fallback
+    def __init__(self, steps, fallback):
+        self.steps = steps
+        self.fallback = fallback
+
+    def guard(self, fighter, target, view, dx):
+        if self.current(fighter) is None:
+            return self.fallback.guard(fighter, target, view, dx)
+        return dx
+
+    def act(self, fighter, target, view, dx):
+        action = self.current(fighter)
+        if action is None:
+            return self.fallback.act(fighter, target, view, dx)
+        return fighter.apply_controls(action_mask(action, view.direction), target, dx)
+
+    def current(self, fighter):
+        frames = fighter.clock.frames
+        steps = self.steps
+        while steps and steps[0][0] < frames:
+            steps.pop(0)
+        return steps[0][1] if steps else None
+
+
+class SearchPolicy(AIPolicy):
+    def __init__(self, budget_ms=BUDGET_MS, macro_ticks=MACRO_TICKS, horizon=HORIZON_TICKS, depth=PLAN_DEPTH,
+                 exploration=1.0, seed=None):
+        self.budget = budget_ms / 1000
+        self.macro_ticks = macro_ticks
+        self.horizon = horizon
+        self.depth = depth
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.source = None
+        self.sim = None  # Scratch copy of the fight that every rollout restores and plays on
+        self.state = None  # Snapshot of the real fight at the start of this tick's search
+        self.root = Node()
+        self.action = HOLD
+        self.remaining = 0  # Ticks left of the action being played
+        self.rollouts = 0
+        self.think_seconds = 0.0
+        self.max_think_seconds = 0.0
+
+    def act(self, fighter, target, view, dx):
+        start = time.perf_counter()
+        self.search(fighter, start + self.budget)
+        if self.remaining <= 0:
+            self.action = self.best_action(fighter)
+            self.root = self.root.children.get(self.action) or Node()
+            self.remaining = self.macro_ticks
+        self.remaining -= 1
+        elapsed = time.perf_counter() - start
+        self.think_seconds += elapsed
+        self.max_think_seconds = max(self.max_think_seconds, elapsed)
+        controls = action_mask(self.action, view.direction)
+        fighter.fight.inputs[fighter.player - 1] = controls
+        return fighter.apply_controls(controls, target, dx)
+
+    def best_action(self, fighter):
+        if not self.root.children:
+            return APPROACH  # Nothing searched yet (budget too small): close in like the basic AI
+        return max(self.root.children.items(), key=lambda item: (item[1].visits, item[1].value))[0]
+
+    def search(self, fighter, deadline):
+        fight = fighter.fight
+        if self.source is not fight:
+            self.prepare(fight)
+        self.state = fight.snapshot(self.state)
+        while time.perf_counter() < deadline:
+            path = self.select()
+            score = self.rollout(fighter, [action for action, _ in path[1:]], deadline)
+            if score is None:
+                return  # Out of time mid-rollout; the partial result is thrown away
+            for _, node in path:
+                node.visits += 1
+                node.value += score
+            self.rollouts += 1
+
+    def select(self):
+        # UCB1 down the tree, expanding the first untried action met on the way
+        node = self.root
+        path = [(None, node)]
+        while len(path) <= self.depth:
+            # Children left unvisited by a rollout that ran out of time count as untried
+            untried = [action for action in ACTIONS if action not in node.children or not node.children[action].visits]
+            if untried:
+                action = self.rng.choice(untried)
+                child = node.children[action] = Node()
+                path.append((action, child))
+                return path
+            log_visits = math.log(node.visits)
+            action, node = max(node.children.items(), key=lambda item: item[1].value / item[1].visits +
+                               self.exploration * math.sqrt(log_visits / item[1].visits))
+            path.append((action, node))
+        return path
+
+    def prepare(self, fight):
+        # Made once per fight; restoring a snapshot is cheaper than cloning, and leaves no garbage
+        self.source = fight
+        self.sim = sim = fight.clone()
+        for copy in (sim.fighter_1, sim.fighter_2):
+            if not copy.is_ai:  # A human opponent is modelled by their character's AI
+                copy.is_ai = True
+                copy.ai_policy = copy.stats.ai_policy
+                copy.view = Perception()
+
+    def rollout(self, fighter, plan, deadline):
+        sim = self.sim
+        sim.restore(self.state, rng=False)
+        sim.rng.state = self.rng.getrandbits(64)
+        me, other = (sim.fighter_1, sim.fighter_2) if fighter.player == 1 else (sim.fighter_2, sim.fighter_1)
+        frames = sim.clock.frames
+        # The action being played finishes first (or is chosen now, if it just ended), then the plan
+        steps = []
+        if self.remaining > 0:
+            frames += self.remaining
+            steps.append((frames, self.action))
+        for action in plan:
+            frames += self.macro_ticks
+            steps.append((frames, action))
+        me.ai_policy = ScriptedPolicy(steps, me.stats.ai_policy)
+        start_me, start_other = me.health, other.health
+        for _ in range(self.horizon):
+            if time.perf_counter() > deadline:
+                return None
+            sim.clock.tick()
+            if sim.step() or sim.round_over:
+                break
+        score = ((start_other - max(0, other.health)) - (start_me - max(0, me.health))) / 100
+        if not other.alive:
+            score += 1
+        if not me.alive:
+            score -= 1
+        return score
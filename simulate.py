@@ -0,0 +1,107 @@
+import argparse
+import os
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import FPS, CHARACTER_DATA, CHARACTER_STATS, FightState, ManualClock, build_fighter
+from ai import TimedPolicy
+from search_ai import BUDGET_MS, SearchPolicy
+
+# ------------------------------------------------------------------------------------------------------HEADLESS MATCHES
+# No display, mixer or sprite surfaces: both fighters are AI and time comes from a ManualClock,
+# so a match runs as fast as the rules can be evaluated
+MAX_MATCH_TICKS = FPS * 180  # Three minutes of game time, then the match is a draw
+
+
+def create_match(char_1, char_2, seed=None):
+    clock = ManualClock()
+    fight = FightState(clock=clock, seed=seed, sound_on=False)
+    fight.intro_count = 0  # No countdown in scripted fights
+    fight.fighter_1 = build_fighter(fight, 1, char_1, 300, False, is_ai=True)
+    fight.fighter_2 = build_fighter(fight, 2, char_2, 600, True, is_ai=True)
+    return fight
+
+
+def run_match(char_1, char_2, seed=None, max_ticks=MAX_MATCH_TICKS):
+    return play_match(create_match(char_1, char_2, seed), max_ticks)
+
+
+def play_match(fight, max_ticks=MAX_MATCH_TICKS):
+    clock = fight.clock
+    winner = None
+    while winner is None and clock.frames < max_ticks:
+        clock.tick()
+        winner = fight.step()
+    return {
+        "fighter1": fight.fighter_1.stats.name,
+        "fighter2": fight.fighter_2.stats.name,
+        "seed": fight.seed,
+        "winner": winner or "Draw",
+        "ticks": clock.frames,
+        "duration": clock.get_ticks(),
+        "health1": max(0, fight.fighter_1.health),
+        "health2": max(0, fight.fighter_2.health),
+    }
+
+
+def ai_cost(matches, seed=0):
+    # Time each character's AI policy decisions as player 1 against every opponent
+    print(f"{'character':<10}{'AI ticks':>10}{'us/AI tick':>12}{'us/tick':>10}{'AI share':>10}")
+    for char_name in CHARACTER_DATA:
+        timer = TimedPolicy(CHARACTER_STATS[char_name].ai_policy)
+        ticks = 0
+        start = time.perf_counter()
+        for opponent in CHARACTER_DATA:
+            for i in range(matches):
+                fight = create_match(char_name, opponent, seed + i)
+                fight.fighter_1.ai_policy = timer
+                ticks += play_match(fight)["ticks"]
+        elapsed = time.perf_counter() - start
+        print(f"{char_name:<10}{timer.calls:>10}{timer.seconds / max(1, timer.calls) * 1e6:>12.2f}"
+              f"{elapsed / ticks * 1e6:>10.2f}{timer.seconds / elapsed:>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI matches")
+    parser.add_argument("fighter1", nargs="?", choices=list(CHARACTER_DATA))
+    parser.add_argument("fighter2", nargs="?", choices=list(CHARACTER_DATA))
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--search", type=int, choices=[1, 2], help="give this player the lookahead AI")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="lookahead time per tick in ms")
+    parser.add_argument("--ai-cost", action="store_true",
+                        help="time every character's AI policy against all opponents instead")
+    args = parser.parse_args()
+    if args.ai_cost:
+        ai_cost(args.matches, args.seed)
+        return
+    if not args.fighter2:
+        parser.error("two fighters are required unless --ai-cost is given")
+
+    wins = {"Player 1": 0, "Player 2": 0, "Draw": 0}
+    total_ticks = 0
+    start = time.perf_counter()
+    searches = []
+    for i in range(args.matches):
+        fight = create_match(args.fighter1, args.fighter2, seed=args.seed + i)
+        if args.search:
+            searches.append(SearchPolicy(args.budget, seed=args.seed + i))
+            (fight.fighter_1 if args.search == 1 else fight.fighter_2).ai_policy = searches[-1]
+        result = play_match(fight)
+        wins[result["winner"]] += 1
+        total_ticks += result["ticks"]
+    elapsed = time.perf_counter() - start
+    print(f"{args.fighter1} vs {args.fighter2}: {args.matches} matches")
+    print(f"  {args.fighter1} wins: {wins['Player 1']}  {args.fighter2} wins: {wins['Player 2']}  "
+          f"draws: {wins['Draw']}")
+    print(f"  {total_ticks} ticks in {elapsed:.2f}s ({total_ticks / elapsed:.0f} ticks/s)")
+    if searches:
+        rollouts = sum(search.rollouts for search in searches)
+        think = sum(search.think_seconds for search in searches)
+        worst = max(search.max_think_seconds for search in searches)
+        print(f"  lookahead (player {args.search}): {rollouts / total_ticks:.1f} rollouts/tick, "
+              f"{think / total_ticks * 1000:.2f} ms/tick average, {worst * 1000:.2f} ms worst (budget {args.budget} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# -----------------------------------------------------------------------------------------------------STARTUP BENCHMARK
+# Starts the game several times under the dummy SDL drivers and times each start, from spawning the
+# process to the first menu frame on screen (python main.py --startup-check). Fails when the
+# slowest start goes over the budget: the first run is the coldest, the closest thing here to a
+# cabinet being switched on. Set SDL_VIDEODRIVER/SDL_AUDIODRIVER to time the real drivers.
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET_MS = 1000
+DEFAULT_IMPORT_BUDGET_MS = 600
+STAGES = ["interpreter", "imports", "first_frame"]  # Milliseconds since the process was spawned
+
+
+def game_environment():
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    return env
+
+
+def start_game(env, python_flags=()):
+    # Returns the stage times of one start, and what the game wrote to stderr
+    spawned = time.time()
+    result = subprocess.run([sys.executable, *python_flags, "main.py", "--startup-check"], cwd=GAME_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            times = json.loads(line[len("STARTUP "):])
+            stages = {
+                "interpreter": times["started"] - spawned,
+                "imports": times["imported"] - spawned,
+                "first_frame": times["first_frame"] - spawned,
+            }
+            return {name: seconds * 1000 for name, seconds in stages.items()}, result.stderr
+    raise RuntimeError(f"main.py exited without showing a frame (code {result.returncode}):\n{result.stderr.strip()}")
+
+
+def slowest_imports(stderr, count):
+    # Top-level imports of main.py by cumulative time, from python -X importtime
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            imports.append((int(cumulative) / 1000, name.strip()))
+    imports.sort(reverse=True)
+    return imports[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time game start-up to the first menu frame and check it "
+                                                 "against a budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="slowest allowed spawn to first frame")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="slowest allowed spawn to the end of main.py's imports")
+    parser.add_argument("--imports", type=int, default=0, metavar="N",
+                        help="also list the N slowest imports of one extra start")
+    args = parser.parse_args()
+    env = game_environment()
+    runs = []
+    print(f"{'run':>8}" + "".join(f"{name + ' ms':>16}" for name in STAGES))
+    for i in range(args.runs):
+        stages, _ = start_game(env)
+        runs.append(stages)
+        print(f"{i + 1:>8}" + "".join(f"{stages[name]:>16.1f}" for name in STAGES))
+    for label, pick in (("median", statistics.median), ("slowest", max)):
+        print(f"{label:>8}" + "".join(f"{pick(run[name] for run in runs):>16.1f}" for name in STAGES))
+    if args.imports:
+        _, stderr = start_game(env, ("-X", "importtime"))
+        print("slowest imports (cumulative):")
+        for ms, name in slowest_imports(stderr, args.imports):
+            print(f"  {ms:8.1f} ms  {name}")
+    failures = []
+    slowest_imports_ms = max(run["imports"] for run in runs)
+    slowest_frame_ms = max(run["first_frame"] for run in runs)
+    if slowest_imports_ms > args.import_budget_ms:
+        failures.append(f"imports took {slowest_imports_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    if slowest_frame_ms > args.budget_ms:
+        failures.append(f"first frame took {slowest_frame_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if failures:
+        print("OVER BUDGET: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"within budget: first frame {slowest_frame_ms:.0f} / {args.budget_ms:.0f} ms, "
+          f"imports {slowest_imports_ms:.0f} / {args.import_budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from engine import (FPS, CHARACTER_DATA, SPECIAL_TYPES, STATUS_STUN, STATUS_ROOT, STATUS_EXHAUST, STATUS_CURSE,
+                    EVENT_DAMAGE, EVENT_BLOCK, EVENT_STEAL, EVENT_STATUS, EVENT_SPECIAL, CAUSE_NAMES, CombatEvents)
+from persist import PersistenceWorker
+from replay import write_text, read_text
+from simulate import MAX_MATCH_TICKS, create_match
+
+# -----------------------------------------------------------------------------------------------------COMBAT TELEMETRY
+# python main.py --telemetry logs every local match's combat events, one file per match in
+# TELEMETRY_DIR: a header (seed, start time, mode, characters), one packed record per event, and a
+# closing record with the winner. Records collect in memory and go out BATCH_BYTES at a time,
+# appended by the persistence worker, so the frame loop never waits on the disk. A record is 7 to
+# 11 bytes; a match is a few KB. python telemetry.py [LOG|FOLDER ...] prints per-character damage
+# breakdowns over the logs; --overhead N measures what the logging costs per tick.
+TELEMETRY_MAGIC = b"SMFGT"
+TELEMETRY_VERSION = 1
+TELEMETRY_DIR = "SMFG_telemetry"
+BATCH_BYTES = 4096
+HEADER = struct.Struct("<BIdB")  # version, seed, start time (Unix seconds), fighter count
+EVENT_END = 0  # Closing record: fight time, then the winner as text
+RECORDS = {
+    EVENT_END: struct.Struct("<BI"),
+    EVENT_DAMAGE: struct.Struct("<BIBBhB"),
+    EVENT_BLOCK: struct.Struct("<BIBBh?"),
+    EVENT_STEAL: struct.Struct("<BIBBh"),
+    EVENT_STATUS: struct.Struct("<BIBBBH"),
+    EVENT_SPECIAL: struct.Struct("<BIBB"),
+}
+STATUS_NAMES = {STATUS_STUN: "stun", STATUS_ROOT: "root", STATUS_EXHAUST: "exhaust", STATUS_CURSE: "curse"}
+SPECIAL_NAMES = {code: name for name, code in SPECIAL_TYPES.items() if name}
+
+
+class TelemetryLog:
+    def __init__(self, persistence=None, folder=TELEMETRY_DIR, batch_bytes=BATCH_BYTES):
+        self.persistence = persistence  # Writes the batches on its thread; None writes them right away
+        self.folder = folder
+        self.batch_bytes = batch_bytes
+        self.fight = None
+        self.path = None
+        self.written = False
+        self.buffer = bytearray()
+        self.events = 0
+
+    def begin(self, fight, names, game_mode):
+        # Opens the log of a new match and listens on its bus (made if the fight has none)
+        if self.fight:
+            self.end("Abandoned")
+        if fight.events is None:
+            fight.events = CombatEvents()
+        fight.events.subscribe(self.record)
+        self.fight = fight
+        self.path = os.path.join(self.folder, f"{time.strftime('%Y%m%d-%H%M%S')}_{game_mode}_{fight.seed}.smfgt")
+        self.written = False
+        self.buffer += TELEMETRY_MAGIC
+        self.buffer += HEADER.pack(TELEMETRY_VERSION, fight.seed, time.time(), len(names))
+        write_text(self.buffer, game_mode)
+        for name in names:
+            write_text(self.buffer, name)
+
+    def record(self, event):
+        self.buffer += RECORDS[event[0]].pack(*event)
+        self.events += 1
+        if len(self.buffer) >= self.batch_bytes:
+            self.flush()
+
+    def end(self, winner):
+        if self.fight is None:
+            return
+        self.buffer += RECORDS[EVENT_END].pack(EVENT_END, self.fight.clock.get_ticks())
+        write_text(self.buffer, winner)
+        self.fight.events.unsubscribe(self.record)
+        self.flush()
+        self.fight = None
+
+    def flush(self):
+        if not self.buffer:
+            return
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        if self.persistence:
+            self.persistence.call(write_batch, self.path, data, self.written)
+        else:
+            write_batch(self.path, data, self.written)
+        self.written = True
+
+
+def write_batch(path, data, append):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'ab' if append else 'wb') as f:
+        f.write(data)
+
+
+def read_log(data):
+    # Returns the header as a dict and the events as tuples, the closing record as (EVENT_END, time,
+    # winner). A log cut short (the game was killed) keeps every whole record and has no winner.
+    if not data.startswith(TELEMETRY_MAGIC):
+        raise ValueError("not a telemetry log")
+    pos = len(TELEMETRY_MAGIC)
+    version, seed, started, count = HEADER.unpack_from(data, pos)
+    if version != TELEMETRY_VERSION:
+        raise ValueError(f"unsupported telemetry version {version}")
+    pos += HEADER.size
+    game_mode, pos = read_text(data, pos)
+    names = []
+    for _ in range(count):
+        name, pos = read_text(data, pos)
+        names.append(name)
+    header = {"seed": seed, "started": started, "game_mode": game_mode, "names": names, "winner": None}
+    events = []
+    while pos < len(data):
+        record = RECORDS.get(data[pos])
+        if record is None or pos + record.size > len(data):
+            break
+        event = record.unpack_from(data, pos)
+        pos += record.size
+        if event[0] == EVENT_END:
+            header["winner"], pos = read_text(data, pos)
+            events.append(event + (header["winner"],))
+            break
+        events.append(event)
+    return header, events
+
+
+# -----------------------------------------------------------------------------------------------------------ANALYTICS
+def new_totals():
+    return {"matches": 0, "wins": 0, "dealt": dict.fromkeys(CAUSE_NAMES.values(), 0), "taken": 0, "drained": 0,
+            "broken": 0, "healed": 0, "statuses": dict.fromkeys(STATUS_NAMES.values(), 0), "specials": 0}
+
+
+def add_match(totals, header, events):
+    # Adds one match to the per-character totals
+    names = header["names"]
+    for player, name in enumerate(names, 1):
+        character = totals.setdefault(name, new_totals())
+        character["matches"] += 1
+        if header["winner"] == f"Player {player}":
+            character["wins"] += 1
+    for event in events:
+        kind = event[0]
+        if kind == EVENT_END:
+            continue
+        source = totals[names[event[2] - 1]] if event[2] else None
+        target = totals[names[event[3] - 1]] if kind != EVENT_SPECIAL else None
+        if kind == EVENT_DAMAGE:
+            source["dealt"][CAUSE_NAMES[event[5]]] += event[4]
+            target["taken"] += event[4]
+        elif kind == EVENT_BLOCK:
+            source["drained"] += event[4]
+            source["broken"] += event[5]
+        elif kind == EVENT_STEAL:
+            source["healed"] += event[4]
+        elif kind == EVENT_STATUS:
+            # Conditions nobody put there (a root at the end of a pull) count for the one who has them
+            (source or target)["statuses"][STATUS_NAMES[event[4]]] += 1
+        elif kind == EVENT_SPECIAL:
+            source["specials"] += 1
+
+
+def log_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".smfgt"))
+        else:
+            yield path
+
+
+def print_breakdown(totals):
+    # Averages per match: damage dealt by cause and taken, block stamina drained from opponents and
+    # blocks broken, health drawn by steals, status effects put on others, specials used
+    causes = list(CAUSE_NAMES.values())
+    statuses = list(STATUS_NAMES.values())
+    columns = ["matches", "win %"] + causes + ["taken", "drained", "broken", "healed"] + statuses + ["specials"]
+    print(f"{'character':<10}" + "".join(f"{column:>9}" for column in columns))
+    for name, character in sorted(totals.items()):
+        matches = character["matches"] or 1
+        values = [character["matches"], character["wins"] * 100 / matches]
+        values += [character["dealt"][cause] / matches for cause in causes]
+        values += [character[key] / matches for key in ("taken", "drained", "broken", "healed")]
+        values += [character["statuses"][status] / matches for status in statuses]
+        values.append(character["specials"] / matches)
+        print(f"{name:<10}{values[0]:>9}" + "".join(f"{value:>9.1f}" for value in values[1:]))
+
+
+# ------------------------------------------------------------------------------------------------------------OVERHEAD
+def timed_match(names, seed, log):
+    # Headless AI match with or without a log listening; returns step seconds, ticks, events and the result
+    fight = create_match(names[0], names[1], seed)
+    if log:
+        log.begin(fight, names, "TEST")
+    clock = fight.clock
+    perf_counter = time.perf_counter
+    winner = None
+    seconds = 0.0
+    while winner is None and clock.frames < MAX_MATCH_TICKS:
+        clock.tick()
+        start = perf_counter()
+        winner = fight.step()
+        seconds += perf_counter() - start
+    events = log.events if log else 0
+    if log:
+        log.end(winner or "Draw")
+        log.events = 0
+    return seconds, clock.frames, events, (winner, fight.fighter_1.health, fight.fighter_2.health)
+
+
+def measure_overhead(matches, seed, rounds=3):
+    # Every pairing, each match played without and with the log (written to a temporary folder by a
+    # persistence worker, as in the game); the faster of rounds runs counts. The frame share is the
+    # extra step time per tick against one frame at FPS.
+    print(f"{'pairing':<20}{'ticks':>8}{'events':>8}{'off us/tick':>13}{'on us/tick':>12}{'frame share':>13}")
+    frame_us = 1e6 / FPS
+    totals = [0.0, 0.0, 0, 0]
+    with tempfile.TemporaryDirectory() as folder:
+        persistence = PersistenceWorker()
+        log = TelemetryLog(persistence, folder)
+        for name_1 in CHARACTER_DATA:
+            for name_2 in CHARACTER_DATA:
+                off = on = 0.0
+                ticks = events = 0
+                for i in range(matches):
+                    best_off = best_on = None
+                    for _ in range(rounds):
+                        seconds, match_ticks, _, result = timed_match((name_1, name_2), seed + i, None)
+                        best_off = seconds if best_off is None else min(best_off, seconds)
+                        seconds, _, match_events, logged = timed_match((name_1, name_2), seed + i, log)
+                        best_on = seconds if best_on is None else min(best_on, seconds)
+                        if logged != result:
+                            raise RuntimeError(f"{name_1} vs {name_2}: logging changed the fight")
+                    off += best_off
+                    on += best_on
+                    ticks += match_ticks
+                    events += match_events
+                share = (on - off) / ticks * 1e6 / frame_us * 100
+                print(f"{name_1 + ' vs ' + name_2:<20}{ticks:>8}{events:>8}{off / ticks * 1e6:>13.2f}"
+                      f"{on / ticks * 1e6:>12.2f}{share:>12.3f}%")
+                for j, value in enumerate((off, on, ticks, events)):
+                    totals[j] += value
+        persistence.close()
+    off, on, ticks, events = totals
+    print(f"{'all':<20}{ticks:>8}{events:>8}{off / ticks * 1e6:>13.2f}{on / ticks * 1e6:>12.2f}"
+          f"{(on - off) / ticks * 1e6 / frame_us * 100:>12.3f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Damage breakdowns and balance figures from combat telemetry logs "
+                                                 "(python main.py --telemetry writes them)")
+    parser.add_argument("logs", nargs="*", default=[TELEMETRY_DIR], help="log files or folders of them")
+    parser.add_argument("--overhead", type=int, metavar="N",
+                        help="instead, time N headless matches per pairing with and without logging")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.overhead:
+        measure_overhead(args.overhead, args.seed)
+        return
+    totals = {}
+    count = 0
+    for path in log_paths(args.logs):
+        with open(path, 'rb') as f:
+            try:
+                header, events = read_log(f.read())
+            except ValueError as e:
+                print(f"{path}: {e}")
+                continue
+        add_match(totals, header, events)
+        count += 1
+    if not count:
+        parser.error("no telemetry logs found")
+    print(f"{count} match(es); per-match averages")
+    print_breakdown(totals)
+
+
+if __name__ == "__main__":
+    main()